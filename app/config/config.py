@@ -1,3 +1,5 @@
+import os
+from functools import cached_property
 from pathlib import Path
 from typing import Tuple
 
@@ -21,6 +23,8 @@ class Settings(BaseSettings):
     
     # File settings
     MAX_UPLOAD_SIZE: int = 100 * 1024 * 1024  # 10MB
+    # Allowance for multipart boundaries and part headers when the request Content-Length is checked
+    MAX_UPLOAD_MULTIPART_OVERHEAD: int = 64 * 1024
     ALLOWED_EXTENSIONS: Tuple[str, ...] = ('docx', 'doc', 'xlsx', 'xls')
     
     # Paths
@@ -30,6 +34,10 @@ class Settings(BaseSettings):
     PATH_TO_CONFIG_RESULT_TABLE: Path = BASE_DIR / "config/result_table_config.json"
     PATH_TO_CONFIG_LOGS: Path = BASE_DIR / "config/logging_config.json"
     
+    # Processing
+    # Number of files processed at the same time: limits memory used by pandas/openpyxl parsing
+    MAX_CONCURRENT_PARSES: int = max(1, (os.cpu_count() or 1) // 2)
+
     # Security
     MAX_REQUESTS_PER_MINUTE: int = 100
     CORS_ORIGINS: Tuple[str, ...] = ("*",)
@@ -60,14 +68,25 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = True
 
+    @cached_property
+    def MAX_UPLOAD_SIZE_MB(self) -> float:
+        """Maximum upload size in megabytes (for error messages)"""
+        return self.MAX_UPLOAD_SIZE / 1024 / 1024
+
+    @cached_property
+    def ALLOWED_EXTENSIONS_SET(self) -> frozenset:
+        """Allowed extensions in lower case for O(1) membership checks"""
+        return frozenset(extension.lower() for extension in self.ALLOWED_EXTENSIONS)
+
     def is_file_allowed(self, filename: str) -> bool:
         """Check if file extension is allowed"""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in self.ALLOWED_EXTENSIONS
+        return self.get_file_extension(filename) in self.ALLOWED_EXTENSIONS_SET
 
     def get_file_extension(self, filename: str) -> str:
         """Get file extension"""
-        return filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+        # One reverse scan for the last dot instead of a membership test followed by rsplit
+        dot = filename.rfind('.')
+        return filename[dot + 1:].lower() if dot >= 0 else ''
 
 
 # Create settings instance
@@ -21,6 +21,7 @@ class ResultMessages(Enum):
     ERROR_DOCX_EMPTY_DOCUMENT = ("Пустой документ DOCX.", 422)
     ERROR_DOCX_SAVE_PERMISSION_DENIED = ("Нет прав для сохранения файла DOCX.", 403)
     ERROR_DOCX_CONVERSION_FAILED = ("Критическая ошибка при конвертации DOCX.", 499)
+    ERROR_RESULT_FILE_NOT_FOUND = ("Итоговый файл не найден.", 404)
 
     def __init__(self, message, status_code):
         self.message = message
@@ -1,9 +1,9 @@
-import json
+import functools
 import logging
-import os
+from pathlib import Path
 
-from openpyxl import Workbook, load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
+import orjson
+from openpyxl import Workbook
 
 from app.config.config import settings
 
@@ -11,8 +11,29 @@ logger = logging.getLogger(__name__)
 
 # Функция загрузки конфигурации
 def load_config(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return orjson.loads(Path(file_path).read_bytes())
+
+# Конфигурация итоговой таблицы не меняется во время работы, читаем файл один раз
+@functools.lru_cache(maxsize=1)
+def get_result_table_config():
+    return load_config(settings.PATH_TO_CONFIG_RESULT_TABLE)
+
+# Раскладка заголовков в виде кортежей: (title, col_span, ((sub_title, sub_col_span, sub_row_span), ...))
+def flatten_result_table_config(config):
+    return tuple(
+        (
+            section["title"],
+            section.get("col_span"),
+            tuple((sub_header["title"], sub_header["col_span"], sub_header["row_span"])
+                  for sub_header in section["sub_headers"]),
+        )
+        for section in config
+    )
+
+# Раскладка строится один раз из конфигурации, загруженной при старте приложения
+@functools.lru_cache(maxsize=1)
+def get_result_table_layout():
+    return flatten_result_table_config(get_result_table_config())
 
 # Создаем пустую структуру для хранения данных
 def create_data_structure(config):
@@ -22,45 +43,49 @@ def create_data_structure(config):
             data_structure[sub_header["data_variable"]] = None
     return data_structure
 
-data = create_data_structure(load_config(settings.PATH_TO_CONFIG_RESULT_TABLE))
+data = create_data_structure(get_result_table_config())
 
-def create_excel_from_config(config, filename):
+# Путь итогового файла: рядом с исходным, с суффиксом -output
+def get_result_file_path(filename):
+    filename = Path(filename)
+    return filename.with_name(f"{filename.stem}-output.xlsx")
+
+def create_excel_from_config(layout, filename):
     wb = Workbook()
     ws = wb.active
     ws.title = "Report"
-    filename = f"{os.path.dirname(filename)}/{os.path.splitext(os.path.basename(filename))[0]}-output.xlsx"
+    filename = str(get_result_file_path(filename))
 
     # Заполняем заголовки
     current_row = 1
     current_col = 1
+    ws_cell = ws.cell
+    ws_merge = ws.merge_cells
     try:
-        for section in config:
+        for title, section_col_span, sub_headers in layout:
             # Верхний уровень заголовков
-            if section["title"]:
-                col_span = section["col_span"]
-                ws.merge_cells(
+            if title:
+                ws_merge(
                     start_row=current_row,
                     start_column=current_col,
                     end_row=current_row,
-                    end_column=current_col + col_span - 1,
+                    end_column=current_col + section_col_span - 1,
                 )
-                ws.cell(row=current_row, column=current_col).value = section["title"]
+                ws_cell(row=current_row, column=current_col).value = title
 
             # Подзаголовки
-            for sub_header in section["sub_headers"]:
-                col_span = sub_header["col_span"]
-                row_span = sub_header["row_span"]
-                if section["title"] == "":
-                    ws.cell(row=current_row, column=current_col).value = sub_header["title"]
-                    ws.merge_cells(
+            for sub_title, col_span, row_span in sub_headers:
+                if title == "":
+                    ws_cell(row=current_row, column=current_col).value = sub_title
+                    ws_merge(
                         start_row=current_row,
                         start_column=current_col,
                         end_row=current_row + row_span,
                         end_column=current_col + col_span - 1,
                     )
                 else:
-                    ws.cell(row=current_row + 1, column=current_col).value = sub_header["title"]
-                    ws.merge_cells(
+                    ws_cell(row=current_row + 1, column=current_col).value = sub_title
+                    ws_merge(
                     start_row=current_row + 1,
                     start_column=current_col,
                     end_row=current_row + row_span,
@@ -68,29 +93,27 @@ def create_excel_from_config(config, filename):
                 )
                 current_col += col_span
 
-                # Сохраняем файл
-                wb.save(filename)
-
-        logger.info(f"Excel file created successfully: filename")
-        return filename
+        # Книгу не сохраняем: данные дописываются в нее же, сохранение одно в append_df_to_excel
+        logger.info("Excel workbook created successfully: %s", filename)
+        return wb, filename
     except Exception as e:
-        logger.error(f"Error creating Excel file: {str(e)}")
+        logger.error("Error creating Excel file: %s", e)
 
-def append_df_to_excel(filename, df, sheet_name="Sheet1", start_row=None, start_col=None):
+def append_df_to_excel(book, df, sheet_name="Sheet1", start_row=None, start_col=None, filename=None):
     """
-    Добавление DataFrame в Excel файл начиная с определенной строки и столбца.
-    Если файл не существует, он будет создан.
+    Добавление DataFrame в книгу Excel начиная с определенной строки и столбца.
     Если лист не существует, он будет создан.
+    Если указан filename, книга сохраняется в этот файл.
 
-    :param filename: Путь до Excel файла
+    :param book: Книга openpyxl (например, из create_excel_from_config)
     :param df: DataFrame для записи
     :param sheet_name: Имя листа для записи данных
     :param start_row: Начальная строка для записи данных DataFrame
     :param start_col: Начальный столбец для записи данных DataFrame
+    :param filename: Путь для сохранения Excel файла
     """
 
-    # Загрузить книгу и выбрать лист
-    book = load_workbook(filename)
+    # Выбрать лист
     if sheet_name not in book.sheetnames:
         book.create_sheet(sheet_name)
     sheet = book[sheet_name]
@@ -99,13 +122,17 @@ def append_df_to_excel(filename, df, sheet_name="Sheet1", start_row=None, start_
     if start_row is None:
         start_row = sheet.max_row + 1
 
-    # Преобразовать DataFrame в строки Excel и записать данные
-    for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=False), start=start_row):
-        for c_idx, value in enumerate(row, start=start_col if start_col is not None else 1):
-            sheet.cell(row=r_idx, column=c_idx, value=value)
-
-    book.save(filename)
-    book.close()
+    # Все строки одним вызовом в нативные списки Python; astype(object) сохраняет даты как datetime
+    rows = df.astype(object).to_numpy().tolist()
+    # Запись поячеечно через локально связанный sheet.cell: позиция задается явно,
+    # без внутреннего курсора append, который не учитывает объединенные ячейки заголовка
+    sheet_cell = sheet.cell
+    for r_idx, row in enumerate(rows, start=start_row):
+        for c_idx, value in enumerate(row, start=start_col or 1):
+            sheet_cell(row=r_idx, column=c_idx, value=value)
+
+    if filename is not None:
+        book.save(filename)
 
 
 
@@ -1,10 +1,12 @@
 import logging
 import os
+import posixpath
 import re
+import zipfile
+from collections import deque
+from typing import Optional
 
-from docx import Document
-from docx.oxml import CT_P, CT_Tbl
-from openpyxl import Workbook
+from lxml import etree
 
 from app.config.result_messages import ResultMessages
 from app.constants.constants import account_number, currency_code
@@ -12,6 +14,40 @@ from app.constants.regex_patterns import ACCOUNT_NUMBER_PATTERN, CURRENCY_CODE_P
     PAYMENT_PURPOSE_PATTERN
 from app.preprocessor.preprocessor import ProcessingError, ErrorSeverity
 
+# Регулярные выражения компилируются один раз, т.к. применяются к каждой ячейке каждой таблицы
+_OP_DATE_RE = re.compile(OPERATION_DATE_PATTERN, re.IGNORECASE)
+_PAY_PURPOSE_RE = re.compile(PAYMENT_PURPOSE_PATTERN, re.IGNORECASE)
+_ACCT_RE = re.compile(ACCOUNT_NUMBER_PATTERN, re.IGNORECASE)
+_CCY_RE = re.compile(CURRENCY_CODE_PATTERN, re.IGNORECASE)
+_20DIGITS_RE = re.compile(r'\b\d{20}\b')
+_3DIGITS_RE = re.compile(r'\b\d{3}\b')
+
+# Пространства имен WordprocessingML и связей пакета
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+_W_BODY = _W + 'body'
+_W_P = _W + 'p'
+_W_TBL = _W + 'tbl'
+_W_TR = _W + 'tr'
+_W_TC = _W + 'tc'
+_W_R = _W + 'r'
+_W_T = _W + 't'
+_W_HYPERLINK = _W + 'hyperlink'
+_W_TCPR = _W + 'tcPr'
+_W_TRPR = _W + 'trPr'
+_W_VAL = _W + 'val'
+_W_TYPE = _W + 'type'
+
+# Текстовые эквиваленты содержимого run, как в python-docx (w:t обрабатывается отдельно)
+_RUN_CHAR_TEXT = {
+    _W + 'tab': '\t',
+    _W + 'ptab': '\t',
+    _W + 'cr': '\n',
+    _W + 'noBreakHyphen': '-',
+}
+
 
 class AdditionalData:
     def __init__(self):
@@ -21,7 +57,14 @@ class AdditionalData:
 
 logger = logging.getLogger(__name__)
 
-def docx_to_xlsx(input_file, output_file) -> tuple[bool, list[ProcessingError]]:
+def docx_to_rows(input_file) -> tuple[Optional[list[list[str]]], list[ProcessingError]]:
+    """
+    Чтение .docx в строки листа (список списков строк) без промежуточного .xlsx файла.
+
+    Returns:
+    - list[list[str]] | None: Строки листа, None при критической ошибке
+    - list[ProcessingError]: Список ошибок обработки
+    """
     errors = []
     try:
         # Проверка существования входного файла
@@ -34,93 +77,58 @@ def docx_to_xlsx(input_file, output_file) -> tuple[bool, list[ProcessingError]]:
             )
             logger.error(error.message)
             errors.append(error)
-            return False, errors
-
-
-        # Читаем содержимое .docx через docx
-        doc = Document(input_file)
-
-        # Проверка, что документ не пустой
-        if len(doc.paragraphs) == 0 and len(doc.tables) == 0:
-            error = ProcessingError(
-                code=ResultMessages.ERROR_DOCX_EMPTY_DOCUMENT.status_code,
-                message=ResultMessages.ERROR_DOCX_EMPTY_DOCUMENT.message,
-                severity=ErrorSeverity.WARNING,
-                details={"file_path": input_file}
-            )
-            logger.warning(error.message)
-            errors.append(error)
+            return None, errors
 
-        # Создаем новый .xlsx файл
-        wb = Workbook()
-        ws = wb.active
-
-        # Переменные для отслеживания строки в Excel
-        row = 1
-        # Массив с номерами счетов должников
-        additional_datas = []
-        # Проход по всем элементам в .docx
-        for element in doc.element.body:
-            # Проверяем, является ли элемент параграфом (CT_P)
-            if isinstance(element, CT_P):
-                paragraph = element.text.strip()
-                if paragraph:
-                    ws.cell(row=row, column=1, value=paragraph)
-                    row += 1
-            # Проверяем, является ли элемент таблицей (CT_Tbl)
-            elif isinstance(element, CT_Tbl):
-                table = next(t for t in doc.tables if t._tbl == element)
-                for table_row in table.rows:
-                    table_data = [cell.text.strip() for cell in table_row.cells]
+        rows = []
+        # Очередь с номерами счетов должников
+        additional_datas = deque()
+        is_empty_document = True
+        # Проход по параграфам и таблицам верхнего уровня тела документа, XML читается потоком
+        for element in iter_body_elements(input_file):
+            is_empty_document = False
+            if element.tag == _W_P:
+                paragraph = get_paragraph_text(element)
+                if paragraph and (paragraph := paragraph.strip()):
+                    rows.append([paragraph])
+            else:
+                table = get_table_rows(element)
+                # Номер счета и код валюты, дописываемые к строкам таблицы операций
+                operations_extra_data = None
+                for table_row in table:
+                    table_data = list(table_row)
                     # Ищем номер счета и код валюты
                     get_account_number_and_currency_code(additional_datas, table, table_data)
                     if len(table_data) < 4 and len(additional_datas) > 0:
-                        intersect = [i.account_number for i in additional_datas if i.account_number in table_data]
+                        row_set = set(table_data)
+                        intersect = [i.account_number for i in additional_datas if i.account_number in row_set]
                         if len(intersect) > 0:
                             if additional_datas[0].account_number not in intersect:
-                                del additional_datas[0]
-                    if len(table_data) > 5 and [i for i, s in enumerate(table_data) if
-                                                re.search(OPERATION_DATE_PATTERN, s, re.IGNORECASE)] and [i for i, s in
-                                                                                                          enumerate(table_data) if
-                                                                                                          re.search(PAYMENT_PURPOSE_PATTERN, s,
-                                                                                                                    re.IGNORECASE)]:
+                                additional_datas.popleft()
+                    if (len(table_data) > 5
+                            and any(_OP_DATE_RE.search(s) for s in table_data)
+                            and any(_PAY_PURPOSE_RE.search(s) for s in table_data)):
                         table_data.append(account_number)
                         table_data.append(currency_code)
-                        for row_index in range(len(table.rows)):
-                            ws.cell(row=row_index+row, column=len(table_data)-1, value=additional_datas[0].account_number)
-                            ws.cell(row=row_index+row, column=len(table_data), value=additional_datas[0].currency_code)
-                    # Проверяем, что есть данные в table_data
-                    for col, cell_text in enumerate(table_data, start=1):
-                        ws.cell(row=row, column=col, value=cell_text)
-                    row += 1
-                row += 1
-
-        # Проверка возможности сохранения файла
-        try:
-            wb.save(output_file)
-        except PermissionError:
-            error = ProcessingError(
-                code=ResultMessages.ERROR_DOCX_SAVE_PERMISSION_DENIED.status_code,
-                message=ResultMessages.ERROR_DOCX_SAVE_PERMISSION_DENIED.message,
-                severity=ErrorSeverity.CRITICAL,
-                details={"output_file": output_file}
-            )
-            logger.error(error.message)
-            errors.append(error)
-            return False, errors
-        except Exception as save_error:
+                        operations_extra_data = [additional_datas[0].account_number, additional_datas[0].currency_code]
+                    elif operations_extra_data is not None:
+                        table_data.extend(operations_extra_data)
+                    rows.append(table_data)
+                # Пустая строка-разделитель после таблицы
+                rows.append([])
+
+        # Проверка, что документ не пустой
+        if is_empty_document:
             error = ProcessingError(
-                code=ResultMessages.ERROR_DOCX_CONVERSION_FAILED.status_code,
-                message=ResultMessages.ERROR_DOCX_CONVERSION_FAILED.message,
-                severity=ErrorSeverity.CRITICAL,
-                details={"exception": str(save_error)}
+                code=ResultMessages.ERROR_DOCX_EMPTY_DOCUMENT.status_code,
+                message=ResultMessages.ERROR_DOCX_EMPTY_DOCUMENT.message,
+                severity=ErrorSeverity.WARNING,
+                details={"file_path": input_file}
             )
-            logger.error(error.message)
+            logger.warning(error.message)
             errors.append(error)
-            return False, errors
 
-        logger.info(f"Файл {input_file} успешно конвертирован в формат .xlsx!")
-        return True, errors
+        logger.info("Файл %s успешно прочитан", input_file)
+        return rows, errors
 
     except Exception as e:
         error = ProcessingError(
@@ -131,7 +139,7 @@ def docx_to_xlsx(input_file, output_file) -> tuple[bool, list[ProcessingError]]:
         )
         logger.error(error.message)
         errors.append(error)
-        return False, errors
+        return None, errors
 
 
 def get_account_number_and_currency_code(additional_datas, table, table_data):
@@ -144,10 +152,10 @@ def get_account_number_and_currency_code(additional_datas, table, table_data):
     currency code if they are present.
 
     Args:
-        additional_datas (list): A list of AdditionalData objects where
+        additional_datas (collections.deque): A queue of AdditionalData objects where
             the extracted data will be stored.
-        table (docx.table.Table): The table from which the data is being
-            extracted.
+        table (list): Rows of the table from which the data is being
+            extracted, each row is a list of stripped cell strings.
         table_data (list): A list of strings where each string is a cell
             in the table.
 
@@ -155,15 +163,114 @@ def get_account_number_and_currency_code(additional_datas, table, table_data):
         None
     """
     if len(table_data) > 1:
-        account_number_index = [i for i, s in enumerate(table_data) if re.search(ACCOUNT_NUMBER_PATTERN, s, re.IGNORECASE)]
-        currency_code_index = [i for i, s in enumerate(table_data) if re.search(CURRENCY_CODE_PATTERN, s, re.IGNORECASE)]
-        if account_number_index and currency_code_index:
-            for current_table_row in table.rows:
+        account_number_index = next((i for i, s in enumerate(table_data) if _ACCT_RE.search(s)), -1)
+        currency_code_index = next((i for i, s in enumerate(table_data) if _CCY_RE.search(s)), -1)
+        if account_number_index >= 0 and currency_code_index >= 0:
+            for current_table_row in table:
                 additional_data = AdditionalData()
-                if re.search(r'\b\d{20}\b', current_table_row.cells[account_number_index[0]].text.strip(),
-                             re.IGNORECASE):
-                    additional_data.account_number = current_table_row.cells[account_number_index[0]].text.strip()
-                if re.search(r'\b\d{3}\b', current_table_row.cells[currency_code_index[0]].text.strip(), re.IGNORECASE):
-                    additional_data.currency_code = current_table_row.cells[currency_code_index[0]].text.strip()
+                if _20DIGITS_RE.search(current_table_row[account_number_index]):
+                    additional_data.account_number = current_table_row[account_number_index]
+                if _3DIGITS_RE.search(current_table_row[currency_code_index]):
+                    additional_data.currency_code = current_table_row[currency_code_index]
                 if additional_data.account_number or additional_data.currency_code:
-                    additional_datas.append(additional_data)
\ No newline at end of file
+                    additional_datas.append(additional_data)
+
+def get_main_document_part_name(docx_zip):
+    """Имя основной части документа (обычно word/document.xml) по связям пакета"""
+    try:
+        rels = etree.fromstring(docx_zip.read('_rels/.rels'))
+    except KeyError:
+        return 'word/document.xml'
+    for rel in rels.iter(_REL + 'Relationship'):
+        if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+            return posixpath.normpath(rel.get('Target').lstrip('/'))
+    return 'word/document.xml'
+
+
+def iter_body_elements(input_file):
+    """
+    Потоковый обход параграфов (w:p) и таблиц (w:tbl) верхнего уровня тела документа.
+
+    Вложенные параграфы (например, в ячейках таблиц) отдельно не возвращаются.
+    Обработанные элементы очищаются, чтобы дерево документа не росло в памяти.
+    """
+    with zipfile.ZipFile(input_file) as docx_zip:
+        with docx_zip.open(get_main_document_part_name(docx_zip)) as document_xml:
+            for _, element in etree.iterparse(document_xml, events=('end',), tag=(_W_P, _W_TBL)):
+                parent = element.getparent()
+                if parent is None or parent.tag != _W_BODY:
+                    continue
+                yield element
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del parent[0]
+
+
+def get_run_text(run):
+    """Текст w:r с учетом табуляций, переносов и неразрывных дефисов, как у python-docx"""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == _W_T:
+            if child.text:
+                parts.append(child.text)
+        elif tag == _W + 'br':
+            # Переносом строки считается только разрыв textWrapping (тип по умолчанию)
+            if child.get(_W_TYPE, 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif tag in _RUN_CHAR_TEXT:
+            parts.append(_RUN_CHAR_TEXT[tag])
+    return ''.join(parts)
+
+
+def get_paragraph_text(paragraph):
+    """Текст w:p: run'ы параграфа и run'ы внутри гиперссылок"""
+    parts = []
+    for child in paragraph:
+        if child.tag == _W_R:
+            parts.append(get_run_text(child))
+        elif child.tag == _W_HYPERLINK:
+            parts.extend(get_run_text(run) for run in child.iterchildren(_W_R))
+    return ''.join(parts)
+
+
+def get_table_rows(table):
+    """
+    Строки таблицы в виде списков очищенных от пробелов текстов ячеек.
+
+    Как и python-docx, ячейка, объединенная по горизонтали (gridSpan), повторяется
+    для каждого занятого столбца сетки, а продолжение вертикального объединения
+    (vMerge) берет текст из ячейки строкой выше.
+    """
+    rows = []
+    # Текст и ширина ячеек предыдущей строки по смещению в сетке таблицы
+    cells_above = {}
+    for tr in table.iterchildren(_W_TR):
+        row = []
+        cells = {}
+        grid_offset = get_int_property(tr.find(_W_TRPR), 'gridBefore', 0)
+        for tc in tr.iterchildren(_W_TC):
+            tc_pr = tc.find(_W_TCPR)
+            grid_span = get_int_property(tc_pr, 'gridSpan', 1)
+            v_merge = tc_pr.find(_W + 'vMerge') if tc_pr is not None else None
+            if v_merge is not None and v_merge.get(_W_VAL, 'continue') == 'continue':
+                text, span = cells_above.get(grid_offset, ('', grid_span))
+            else:
+                text = '\n'.join(get_paragraph_text(p) for p in tc.iterchildren(_W_P)).strip()
+                span = grid_span
+            cells[grid_offset] = (text, span)
+            row.extend([text] * span)
+            grid_offset += grid_span
+        rows.append(row)
+        cells_above = cells
+    return rows
+
+
+def get_int_property(properties, name, default):
+    """Целочисленное значение w:val дочернего элемента свойств (w:trPr, w:tcPr)"""
+    if properties is None:
+        return default
+    value = properties.find(_W + name)
+    if value is None:
+        return default
+    return int(value.get(_W_VAL))
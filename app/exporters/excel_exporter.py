@@ -1,6 +1,15 @@
 import pandas as pd
+from openpyxl import Workbook
 
 class ExcelExporter:
     @staticmethod
     def export(df: pd.DataFrame, output_file: str):
-        df.to_excel(output_file, index=False)
+        # write_only книга не держит ячейки в памяти, строки пишутся потоком
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Report")
+        ws.append(list(map(str, df.columns)))
+        # Пустые значения (NaN) записываем как пустые ячейки, как это делал df.to_excel
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+        wb.save(output_file)
@@ -1,28 +1,81 @@
-import json
+import asyncio
 import logging
-import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List, Optional
+
+from pandas.io.json import build_table_schema
 
 from app.config import result_messages
 from app.config.config import settings
-from app.config.result_table_config_processor import create_excel_from_config, load_config, append_df_to_excel
-from app.converters.docx_to_xlsx_converter import docx_to_xlsx
-from app.preprocessor.preprocessor import parse_xlsx_to_df, ErrorSeverity
+from app.config.logging_config_processor import init_logger
+from app.config.result_table_config_processor import create_excel_from_config, get_result_table_layout, append_df_to_excel
+from app.converters.docx_to_xlsx_converter import docx_to_rows
+from app.preprocessor.preprocessor import parse_xlsx_to_df, parse_rows_to_df, ErrorSeverity
 from app.routers.normalize_response import NormalizeResponse, Error, CustomWarning
 
 logger = logging.getLogger(__name__)
 
+# Пул процессов для обработки файлов, создается при первом запросе
+_process_pool: Optional[ProcessPoolExecutor] = None
+# Ограничение числа одновременно обрабатываемых файлов: без него параллельные загрузки больших выписок
+# одновременно разбираются pandas/openpyxl и расходуют память вплоть до свопа
+_parse_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_PARSES)
+
+
+class _Lazy:
+    """Отложенное вычисление строки для логирования: fn вызывается, только если запись будет выведена"""
+    def __init__(self, fn):
+        self.fn = fn
+
+    def __str__(self):
+        return self.fn()
+
+
 def process_file(file_path: Path) -> NormalizeResponse:
     response = select_flow_depends_on_file_extension(file_path)
     return response
 
 
+async def process_file_async(file_path: Path) -> NormalizeResponse:
+    """Обработка файла в пуле процессов: цикл событий не блокируется, а разбор файлов не упирается в GIL"""
+    async with _parse_semaphore:
+        return await asyncio.get_running_loop().run_in_executor(get_process_pool(), process_file, file_path)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        # Рабочие процессы запускаются через spawn: fork процесса, в котором уже работают потоки to_thread,
+        # может унаследовать захваченные ими блокировки. Логирование в новом процессе не настроено,
+        # поэтому каждый процесс при старте загружает ту же конфигурацию логов, что и приложение
+        # Число процессов равно ограничению семафора: больше файлов одновременно не обрабатывается,
+        # а лишние процессы только держали бы в памяти pandas и openpyxl
+        _process_pool = ProcessPoolExecutor(max_workers=settings.MAX_CONCURRENT_PARSES,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=init_logger)
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+
+async def process_files_in_pool(file_paths: List[Path]) -> List[NormalizeResponse]:
+    """Параллельная обработка нескольких файлов в пуле процессов (разбор docx/xlsx упирается в GIL)"""
+    return list(await asyncio.gather(*(process_file_async(path) for path in file_paths)))
+
+
 def select_flow_depends_on_file_extension(file_name: Path) -> NormalizeResponse:
     if file_name.suffix == ".docx":
-        converted_file_path = Path(os.path.dirname(file_name) + "/" + os.path.splitext(os.path.basename(file_name))[0] + ".xlsx")
-        is_ok, errors = docx_to_xlsx(file_name, converted_file_path)
-        if is_ok:
-            return parse_excel_file(converted_file_path)
+        # Строки документа разбираются в памяти, без промежуточного .xlsx файла
+        rows, errors = docx_to_rows(file_name)
+        if rows is not None:
+            return parse_excel_file(file_name, rows)
         else:
             return NormalizeResponse.failure(
                 message=result_messages.ResultMessages.ERROR_DOCX_CONVERSION_FAILED.message,
@@ -32,18 +85,21 @@ def select_flow_depends_on_file_extension(file_name: Path) -> NormalizeResponse:
     if file_name.suffix in [".xlsx", ".xls"]:
         return parse_excel_file(file_name)
 
-def parse_excel_file(file_path: Path) -> NormalizeResponse:
+def parse_excel_file(file_path: Path, rows: Optional[List[list]] = None) -> NormalizeResponse:
     try:
         file_path_str = str(file_path)
-        logger.info(f"Processing file: {file_path_str}")
+        logger.info("Processing file: %s", file_path_str)
         
         # New processing method with ProcessingError
-        df, processing_errors = parse_xlsx_to_df(file_path_str)
+        if rows is None:
+            df, processing_errors = parse_xlsx_to_df(file_path_str)
+        else:
+            df, processing_errors = parse_rows_to_df(rows, file_path_str)
         
         # Check for critical errors first
         critical_errors = [error for error in processing_errors if error.severity == ErrorSeverity.CRITICAL]
         if critical_errors:
-            logger.error(f"Critical errors processing file: {critical_errors}")
+            logger.error("Critical errors processing file: %s", critical_errors)
             return NormalizeResponse.failure(
                 message=result_messages.ResultMessages.ERROR_FILE_READ_FAILED.message,
                 errors=[Error(code=error.code, message=error.message, details=error.details) for error in critical_errors],
@@ -60,38 +116,43 @@ def parse_excel_file(file_path: Path) -> NormalizeResponse:
             )
 
         try:
-            converted_file_path = create_excel_from_config(load_config(settings.PATH_TO_CONFIG_RESULT_TABLE), file_path)
-            append_df_to_excel(converted_file_path, df, sheet_name='Report', start_row=4, start_col=2)
+            # Раскладка заголовков строится один раз из конфигурации, загруженной при старте приложения
+            wb, converted_file_path = create_excel_from_config(get_result_table_layout(), file_path)
+            append_df_to_excel(wb, df, sheet_name='Report', start_row=4, start_col=2, filename=converted_file_path)
         except Exception as e:
-            logger.error(f"Error processing file: {str(e)}")
+            logger.error("Error processing file: %s", e)
             return NormalizeResponse.failure(status_code = result_messages.ResultMessages.ERROR_FILE_WRITE_FAILED.status_code, message=result_messages.ResultMessages.ERROR_FILE_WRITE_FAILED.message, errors=[Error(code=result_messages.ResultMessages.ERROR_FILE_WRITE_FAILED.status_code, message=str(e))])
 
         try:
-            result_json = df.to_json(orient="table")
-            result_json = json.loads(result_json)
+            # Формируем структуру orient="table" напрямую, без сериализации в строку и обратного разбора
+            result_json = {
+                "schema": build_table_schema(df),
+                "data": df.reset_index().to_dict(orient="records"),
+            }
         except Exception as e:
-            logger.error(f"Error converting dataframe to json: {str(e)}")
+            logger.error("Error converting dataframe to json: %s", e)
             return NormalizeResponse.failure(status_code=result_messages.ResultMessages.ERROR_DF_TO_JSON_FAILED.status_code, message=result_messages.ResultMessages.ERROR_DF_TO_JSON_FAILED.message, errors=[Error(code=result_messages.ResultMessages.ERROR_DF_TO_JSON_FAILED.status_code, message=str(e))])
 
         # Handle warnings separately
         warnings = [error for error in processing_errors if error.severity == ErrorSeverity.WARNING]
         if warnings:
-            logger.warning(f"Warnings processing file: {', '.join([w.message for w in warnings])}")
+            logger.warning("Warnings processing file: %s", _Lazy(lambda: ', '.join(w.message for w in warnings)))
             return NormalizeResponse.success_with_warnings(
                 message=result_messages.ResultMessages.WARNING_FILE_PARSED_INCORRECTLY.message,
                 warnings=[CustomWarning(code=w.code, message=w.message, details=w.details) for w in warnings],
                 data=result_json, 
-                file_path=file_path_str
+                # Для .docx промежуточного .xlsx файла нет, поэтому указываем итоговый файл
+                file_path=file_path_str if rows is None else converted_file_path
             )
 
-        logger.info(f"File {file_path_str} processed successfully")
+        logger.info("File %s processed successfully", file_path_str)
         return NormalizeResponse.success(
             message=result_messages.ResultMessages.FILE_PARSED.message, 
             data=result_json, 
             file_path=converted_file_path
         )
     except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
+        logger.error("Error processing file: %s", e)
         return NormalizeResponse.failure(
             message=result_messages.ResultMessages.ERROR_PARSING_FAILED.message,
             status_code=result_messages.ResultMessages.ERROR_PARSING_FAILED.status_code,
@@ -1,51 +1,59 @@
 import logging
 import os
-from pathlib import Path
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.config.config import settings
 from app.config.logging_config_processor import init_logger
+from app.config.result_table_config_processor import get_result_table_layout
+from app.handlers.normalize_file_handler import shutdown_process_pool
 from app.routers import normalize_rout
+from app.routers.normalize_response import ORJSONResponse
+
+logger = logging.getLogger(__name__)
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        logger = logging.getLogger(__name__)
-        logger.info(f"Request: {request.method} {request.url}")
+        logger.info("Request: %s %s", request.method, request.url)
         try:
             response = await call_next(request)
             return response
         except Exception as e:
-            logger.error(f"Request failed: {str(e)}")
-            return JSONResponse(
+            logger.error("Request failed: %s", e)
+            return ORJSONResponse(
                 status_code=500,
                 content={"detail": "Internal server error"}
             )
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the result table header layout on startup, so the first request does not load the config
+    get_result_table_layout()
+    yield
+    # Stop batch processing workers on shutdown
+    shutdown_process_pool()
+
+
 # noinspection PyTypeChecker
 def create_app() -> FastAPI:
     # Initialize logger
     init_logger()
-    logger = logging.getLogger(__name__)
     logger.info("Starting application")
 
-    # Create required directories
-    upload_dir = Path(settings.PATH_TO_UPLOAD_DIRECTORY)
-    upload_dir.mkdir(parents=True, exist_ok=True)
-
-    logs_dir = Path(settings.PATH_TO_LOGS)
-    logs_dir.mkdir(parents=True, exist_ok=True)
+    # Required directories are created once in app.config.config on import
 
     # Initialize FastAPI app_api
     app_fastapi: FastAPI = FastAPI(
         title=settings.TITLE,
         version="1.0.0",
-        description="API for normalizing bank statements"
+        description="API for normalizing bank statements",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
     )
 
     app_fastapi.add_middleware(CORSMiddleware,
@@ -59,7 +67,6 @@ def create_app() -> FastAPI:
 
     # Include routers
     app_fastapi.include_router(normalize_rout.file_normalize_router)
-
     return app_fastapi
 
 
@@ -1,6 +1,7 @@
+import functools
 import logging
 import re
-from collections import Counter
+from dataclasses import dataclass
 from enum import Enum, auto
 from io import BytesIO
 from typing import List, Dict, Any, Optional, Tuple
@@ -25,25 +26,83 @@ from app.constants.regex_patterns import PAYMENT_PURPOSE_PATTERN, PAYER_OR_RECIP
 
 logger = logging.getLogger(__name__)  # Логгер на уровне модуля
 
+# Замены значений не должны молча приводить типы столбцов; опция глобальная, поэтому задается один раз при импорте
+pd.set_option('future.no_silent_downcasting', True)
+
+# Заголовки общей банковской информации (значения ищутся вне таблицы операций)
+_GENERAL_INFO_HEADERS = frozenset((
+    DEBTOR_ACCOUNT_NUMBER,
+    CURRENCY_CODE,
+    DEBTOR_BANK_NAME,
+    DEBTOR_NAME
+))
+
+# Скомпилированные регулярные выражения кэшируются: шаблоны одни и те же для всех ячеек и файлов
+@functools.lru_cache(maxsize=256)
+def _compile(pattern, flags=re.IGNORECASE):
+    return re.compile(pattern, flags)
+
+# Таблица перевода для очистки значений ячеек при поиске заголовков: символы "[().,-]" удаляются, "/" заменяется на пробел
+_HEADER_CLEAN_TABLE = str.maketrans('/', ' ', "[().,-]")
+
+# Форматы дат с днем в начале, встречающиеся в выписках: (регулярное выражение значения, формат для pd.to_datetime)
+# (те же форматы pandas сам угадывает по первому значению при dayfirst=True)
+_DATE_FORMATS = (
+    (re.compile(r'^\d{2}\.\d{2}\.\d{4}$'), '%d.%m.%Y'),
+    (re.compile(r'^\d{2}/\d{2}/\d{4}$'), '%d/%m/%Y'),
+)
+
+# Паттерны сумм операций: "число.число или число" и "число-число"
+_FLOAT_VALUE_RE = re.compile(r'^\d+(\.\d+)?$')
+_DASHED_FLOAT_VALUE_RE = re.compile(r'^\d+-\d+$')
+
+# Паттерны заголовков блока операций и соответствующие им типовые заголовки (порядок определяет приоритет паттернов)
+_BANK_STATEMENT_HEADERS_CORRELATION = {
+    SEQ_NUMBER_PATTERN: SEQ_NUMBER,
+    OPERATION_DATE_PATTERN: DOCUMENT_OPERATION_DATE,
+    DOCUMENT_TYPE_CODE_PATTERN: DOCUMENT_TYPE_CODE,
+    DOCUMENT_NUMBER_PATTERN: DOCUMENT_NUMBER,
+    DOCUMENT_DATE_PATTERN: DOCUMENT_DATE,
+    CORESPONDENT_ACCOUNT_NUMBER_PATTERN: CORESPONDENT_ACCOUNT_NUMBER,
+    PAYER_OR_RECIPIENT_BANK_PATTERN: PAYER_OR_RECIPIENT_BANK,
+    BANK_BIK_PATTERN: BANK_BIK,
+    PAYER_OR_RECIPIENT_NAME_PATTERN: PAYER_OR_RECIPIENT_NAME,
+    PAYER_OR_RECIPIENT_INN_PATTERN: PAYER_OR_RECIPIENT_INN,
+    PAYER_OR_RECIPIENT_KPP_PATTERN: PAYER_OR_RECIPIENT_KPP,
+    ACCOUNT_NUMBER_PATTERN: ACCOUNT_NUMBER,
+    DEBIT_AMOUNT_PATTERN: DEBIT_AMOUNT,
+    CREDIT_AMOUNT_PATTERN: CREDIT_AMOUNT,
+    PAYMENT_PURPOSE_PATTERN: PAYMENT_PURPOSE
+}
+# Типовые заголовки блока операций
+_BANK_STATEMENT_HEADERS = frozenset(_BANK_STATEMENT_HEADERS_CORRELATION.values())
+# Те же заголовки массивом строк для векторной проверки np.isin
+_BANK_STATEMENT_HEADERS_ARRAY = np.array(sorted(_BANK_STATEMENT_HEADERS))
+# Паттерны заголовков блока операций компилируются один раз при импорте модуля: кортежи (функция поиска, заголовок)
+_BANK_STATEMENT_HEADER_SEARCHES = tuple(
+    (_compile(pattern).search, header) for pattern, header in _BANK_STATEMENT_HEADERS_CORRELATION.items()
+)
+# Объединенный паттерн всех заголовков: группа h<номер> указывает, какой из паттернов дал первое совпадение в строке
+_BANK_STATEMENT_HEADERS_UNION_SEARCH = _compile('|'.join(
+    f'(?P<h{header_index}>{pattern})' for header_index, pattern in enumerate(_BANK_STATEMENT_HEADERS_CORRELATION)
+)).search
+
 class ErrorSeverity(Enum):
     """Enum to define error severity levels"""
     CRITICAL = auto()  # Stops further processing
     WARNING = auto()   # Allows processing to continue
     INFO = auto()      # Informational message
 
+@dataclass(slots=True)
 class ProcessingError:
     """Enhanced error class for preprocessing errors"""
-    def __init__(
-        self,
-        code: int,
-        message: str,
-        severity: ErrorSeverity = ErrorSeverity.WARNING,
-        details: Optional[Dict[str, Any]] = None
-    ):
-        self.code = code
-        self.message = message
-        self.severity = severity
-        self.details = details or {}
+    code: int
+    message: str
+    severity: ErrorSeverity = ErrorSeverity.WARNING
+    details: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self):
+        self.details = self.details or {}
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert error to dictionary representation"""
@@ -54,16 +113,24 @@ class ProcessingError:
             "details": self.details
         }
 
-def count_of_filled_sheets_in_wb(wb) -> Tuple[int, List[ProcessingError]]:
+# Значения ячеек, которые pd.read_excel читает как NaN: коды ошибок Excel и строки na_values по умолчанию
+_NA_CELL_VALUES = frozenset((
+    "#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A",
+    "", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>",
+    "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+))
+
+def count_of_filled_sheets_in_wb(wb) -> Tuple[int, list, List[ProcessingError]]:
     """
     Подсчет заполненных листов в рабочей книге с обработкой ошибок
 
     Returns:
     - int: Количество заполненных листов
+    - list: Заполненные листы (объекты Worksheet) в порядке следования в книге
     - List[ProcessingError]: Список ошибок обработки
     """
     errors = []
-    filled_sheets_count = 0
+    filled_sheets = []
     try:
         # Перебор всех листов в книге
         for sheet in wb.worksheets:
@@ -71,7 +138,7 @@ def count_of_filled_sheets_in_wb(wb) -> Tuple[int, List[ProcessingError]]:
             if sheet.max_row > 1 or (sheet.max_row == 1 and sheet.max_column > 1):
                 # Если есть хотя бы одна строка и одна колонка (кроме случая одной ячейки A1),
                 # считаем лист заполненным.
-                filled_sheets_count += 1
+                filled_sheets.append(sheet)
     except Exception as e:
         sheet_count_error = ProcessingError(
             code=500,
@@ -80,7 +147,7 @@ def count_of_filled_sheets_in_wb(wb) -> Tuple[int, List[ProcessingError]]:
             details={"exception": str(e)}
         )
         errors.append(sheet_count_error)
-    return filled_sheets_count, errors
+    return len(filled_sheets), filled_sheets, errors
 
 def parse_xlsx_to_df(file_path) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     """
@@ -94,9 +161,11 @@ def parse_xlsx_to_df(file_path) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     df = pd.DataFrame()
 
     try:
-        wb = openpyxl.load_workbook(file_path, read_only=True)
+        # Те же параметры, с которыми книгу открыл бы pd.read_excel: книга передается в него без повторного чтения.
+        # Формулы, внешние ссылки и макросы не нужны - из книги берутся только значения ячеек
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False, keep_vba=False)
     except Exception as e:
-        logger.error(f"Error processing file: {str(e)}")
+        logger.error("Error processing file: %s", e)
         critical_error = ProcessingError(
             code=500,
             message=f"Failed to read file: {file_path}",
@@ -106,32 +175,84 @@ def parse_xlsx_to_df(file_path) -> Tuple[pd.DataFrame, List[ProcessingError]]:
         errors.append(critical_error)
         return df, errors
 
-    filled_sheets_in_wb, filled_sheets_errors = count_of_filled_sheets_in_wb(wb)
-    errors.extend(filled_sheets_errors)
+    try:
+        filled_sheets_in_wb, filled_sheets, filled_sheets_errors = count_of_filled_sheets_in_wb(wb)
+        errors.extend(filled_sheets_errors)
+
+        if filled_sheets_in_wb == 0:
+            logger.info("File: %s is empty!", file_path)
+            empty_file_error = ProcessingError(
+                code=400,
+                message=f"File: {file_path} is empty!",
+                severity=ErrorSeverity.WARNING
+            )
+            errors.append(empty_file_error)
+            return df, errors
+
+        elif filled_sheets_in_wb > 1:
+            logger.info("Number of filled sheets in file %s is more than 1!", file_path)
+            multiple_sheets_error = ProcessingError(
+                code=400,
+                message=f"Number of filled sheets in file {file_path} is more than 1!",
+                severity=ErrorSeverity.WARNING
+            )
+            errors.append(multiple_sheets_error)
+            return df, errors
+
+        # Process single sheet: читается найденный при подсчете заполненный лист, без повторного поиска по книге.
+        # Значения берет pd.read_excel из уже открытой книги. dtype=object: значения ячеек остаются такими,
+        # как их вернул openpyxl, без вывода типов по столбцам - значения разбираются дальше при обработке
+        df = pd.read_excel(wb, engine='openpyxl', sheet_name=filled_sheets[0].title, header=None, dtype=object)
+    finally:
+        wb.close()
+
+    # Process the dataframe
+    df, processing_errors = processing_file_df(df)
+
+    # Combine and return errors
+    errors.extend(processing_errors)
+
+    return df, errors
+
+def parse_rows_to_df(rows, source_name) -> Tuple[pd.DataFrame, List[ProcessingError]]:
+    """
+    Аналог parse_xlsx_to_df для строк листа, уже находящихся в памяти (например, из docx_to_rows)
 
-    if filled_sheets_in_wb == 0:
-        logger.info(f"File: {file_path} is empty!")
+    Строки приводятся к тому виду, в котором их вернул бы pd.read_excel для листа с этими строками,
+    поэтому дальнейшая обработка не отличается от обработки сохраненного .xlsx файла.
+
+    Returns:
+    - DataFrame: Processed dataframe
+    - List of ProcessingErrors: Warnings and errors encountered during processing
+    """
+    errors = []
+    df = pd.DataFrame()
+
+    # Лист считается заполненным по тем же правилам, что и в count_of_filled_sheets_in_wb
+    max_row = next((row_idx for row_idx in range(len(rows), 0, -1) if rows[row_idx - 1]), 0)
+    max_column = max(map(len, rows), default=0)
+    if not (max_row > 1 or (max_row == 1 and max_column > 1)):
+        logger.info("File: %s is empty!", source_name)
         empty_file_error = ProcessingError(
             code=400,
-            message=f"File: {file_path} is empty!",
+            message=f"File: {source_name} is empty!",
             severity=ErrorSeverity.WARNING
         )
         errors.append(empty_file_error)
         return df, errors
 
-    elif filled_sheets_in_wb > 1:
-        logger.info(f"Number of filled sheets in file {file_path} is more than 1!")
-        multiple_sheets_error = ProcessingError(
-            code=400,
-            message=f"Number of filled sheets in file {file_path} is more than 1!",
-            severity=ErrorSeverity.WARNING
-        )
-        errors.append(multiple_sheets_error)
-        return df, errors
-
-    # Process single sheet
-    worksheet_name = wb.sheetnames[0]
-    df = pd.read_excel(file_path, engine='openpyxl', sheet_name=worksheet_name, header=None)
+    # Подготовка данных как в pd.read_excel: хвостовые пустые ячейки и строки отбрасываются,
+    # пустые ячейки, коды ошибок Excel и строки-пропуски заменяются на NaN, строки выравниваются по ширине
+    data = []
+    for row in rows[:max_row]:
+        row_width = len(row)
+        while row_width and row[row_width - 1] == "":
+            row_width -= 1
+        data.append([np.nan if value in _NA_CELL_VALUES else value for value in row[:row_width]])
+    max_width = max(map(len, data))
+    data = [data_row + [np.nan] * (max_width - len(data_row)) for data_row in data]
+    # dtype=object, как и в parse_xlsx_to_df: строки не приводятся к числам по столбцам
+    df = pd.DataFrame(data, dtype=object)
 
     # Process the dataframe
     df, processing_errors = processing_file_df(df)
@@ -169,37 +290,27 @@ def processing_file_df(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
         bank_statement_df = dfs[1][0]
         headers_count = dfs[1][1]
 
-        bank_statement_df, bank_statement_errors = processing_bank_statement_section(bank_statement_df, headers_count)
-        if bank_statement_errors is not None and [error for error in bank_statement_errors if error.severity == ErrorSeverity.CRITICAL]:
+        # Логические блоки - срезы строк DataFrame, очищенного в parse_df_to_section
+        bank_statement_df, bank_statement_errors = processing_bank_statement_section(
+            bank_statement_df, headers_count, already_cleaned=True)
+        if bank_statement_errors is not None and any(error.severity is ErrorSeverity.CRITICAL for error in bank_statement_errors):
             return bank_statement_df, bank_statement_errors
         if bank_statement_errors is not None:
             errors.extend(bank_statement_errors)
 
-        # Значения для поиска заголовков о соответствующих им значений
-        general_info_headers = [
-            DEBTOR_ACCOUNT_NUMBER,
-            CURRENCY_CODE,
-            DEBTOR_BANK_NAME,
-            DEBTOR_NAME
-        ]
-
-        bank_statement_column_names_set = set(bank_statement_df.columns)
-        common_info_column_names_set = set(general_info_headers)
+        # Заголовки общей банковской информации, которых нет среди столбцов блока операций
+        common_info_column_names_set_diff = _GENERAL_INFO_HEADERS.difference(bank_statement_df.columns)
 
-        # Находим общие заголовки
-        common_col = bank_statement_column_names_set.intersection(common_info_column_names_set)
-
-        # Если общие заголовки полностью совпадают с заголовками общей банковской информации
-        if common_col == common_info_column_names_set:
+        # Если все заголовки общей банковской информации есть среди столбцов блока операций
+        if not common_info_column_names_set_diff:
             return bank_statement_df, errors
 
         # Если общие заголовки не полностью совпадают
         else:
-            common_info_column_names_set_diff = common_info_column_names_set.difference(bank_statement_column_names_set)
-
             # Обработка блока общей информации
             general_bank_info_df = dfs[0]
-            result = processing_general_bank_info_section(general_bank_info_df, common_info_column_names_set_diff)
+            result = processing_general_bank_info_section(general_bank_info_df, common_info_column_names_set_diff,
+                                                          already_cleaned=True)
             errors.extend(result[1])
             common_col_value = result[0]
 
@@ -213,7 +324,8 @@ def processing_file_df(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     elif len(dfs) == 1:
         # Обработка блока общей информации
         general_bank_info_df = dfs[0]
-        common_col_value, general_info_errors = processing_general_bank_info_section(general_bank_info_df, None)
+        common_col_value, general_info_errors = processing_general_bank_info_section(
+            general_bank_info_df, None, already_cleaned=True)
         errors.extend(general_info_errors)
 
         single_block_warning = ProcessingError(
@@ -236,10 +348,12 @@ def processing_file_df(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
         errors.append(no_sections_error)
         return pd.DataFrame(), errors
 
-def processing_bank_statement_section(df_of_bank_statement, headers_count) -> Tuple[pd.DataFrame, List[ProcessingError]]:
+def processing_bank_statement_section(df_of_bank_statement, headers_count, already_cleaned=False) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     """
     Обработка блока информации о совершенных операциях
 
+    already_cleaned=True - блок является срезом строк DataFrame, уже очищенного clean_dataframe
+
     Returns:
     - DataFrame: Обработанный DataFrame
     - List[ProcessingError]: Список ошибок обработки
@@ -247,13 +361,13 @@ def processing_bank_statement_section(df_of_bank_statement, headers_count) -> Tu
     errors = []
 
     # Чистка DataFrame
-    df_of_bank_statement, cleaning_errors = clean_dataframe(df_of_bank_statement)
+    df_of_bank_statement, cleaning_errors = clean_dataframe(df_of_bank_statement, already_cleaned)
     errors.extend(cleaning_errors)
 
     # Корректировка заголовков DataFrame, замена на типовые заголовки
     try:
         df_of_bank_statement, origin_headers, header_correction_errors = correct_df_headers(df_of_bank_statement, headers_count)
-        if header_correction_errors is not None and [error for error in header_correction_errors if error.severity == ErrorSeverity.CRITICAL]:
+        if header_correction_errors is not None and any(error.severity is ErrorSeverity.CRITICAL for error in header_correction_errors):
             return df_of_bank_statement, header_correction_errors
     except Exception as e:
         header_correction_error = ProcessingError(
@@ -286,10 +400,12 @@ def processing_bank_statement_section(df_of_bank_statement, headers_count) -> Tu
 
     return df_of_bank_statement, errors
 
-def processing_general_bank_info_section(general_bank_info_df, common_info_column_names_set_diff=None) -> (Dict[str, Any], List[ProcessingError]):
+def processing_general_bank_info_section(general_bank_info_df, common_info_column_names_set_diff=None, already_cleaned=False) -> (Dict[str, Any], List[ProcessingError]):
     """
     Обработка блока общей информации
 
+    already_cleaned=True - блок является срезом строк DataFrame, уже очищенного clean_dataframe
+
     Returns:
     - Dict: Словарь общей банковской информации
     - List[ProcessingError]: Список ошибок обработки
@@ -314,7 +430,7 @@ def processing_general_bank_info_section(general_bank_info_df, common_info_colum
 
     try:
         # Чистка DataFrame
-        general_bank_info_df, cleaning_errors = clean_dataframe(general_bank_info_df)
+        general_bank_info_df, cleaning_errors = clean_dataframe(general_bank_info_df, already_cleaned)
         errors.extend(cleaning_errors)
 
         # Возврат словаря 'Название заголовка': 'Значение заголовка'
@@ -333,20 +449,10 @@ def processing_general_bank_info_section(general_bank_info_df, common_info_colum
     return common_col_value, errors
 
 def compute_fullness_of_row(df):
-    # Определяем пустой словарь
-    fullness_of_rows = {}
-    for row in df.index:
-        fill_or_empty_cells_in_row = []
-        for col in range(len(df.columns)):
-            cell_value = df.iat[row, col]
-            if pd.isna(cell_value):
-                # Если значение ячейки пустое, то переходим к следующей ячейке
-                fill_or_empty_cells_in_row.append(False)
-                continue
-            else:
-                fill_or_empty_cells_in_row.append(True)
-        fullness_of_rows[row] = sum(fill_or_empty_cells_in_row)
-    return fullness_of_rows
+    # Количество заполненных ячеек в каждой строке одной векторной операцией по маске notna
+    # {индекс строки: количество заполненных ячеек}
+    filled_cells_count = df.notna().to_numpy().sum(axis=1)
+    return dict(zip(df.index.tolist(), filled_cells_count.tolist()))
 
 # get_key_of_most_frequent_value_in_dict функция определения минимального/максимального ключа словаря
 # среди пар, у которых значение равно самому часто встречающемуся значению в словаре
@@ -355,20 +461,23 @@ def get_key_of_most_frequent_value_in_dict(some_dict, value_limit, min_flag = Tr
     # some_dict {индекс строки: количество заполненных ячеек}
     # Подсчет количества каждого значения в словаре, но только если значение между 10 и 18
     # количество заполненных ячеек: количество повторений
-    value_counts = Counter(value for value in some_dict.values() if value_limit[0] < value < value_limit[1])
-    if not value_counts:
+    values = np.fromiter(some_dict.values(), dtype=np.int64, count=len(some_dict))
+    values = values[(value_limit[0] < values) & (values < value_limit[1])]
+    if not values.size:
         return None
-    # Нахождение самого часто встречающегося значения
-    # most_common_value = value_counts.most_common(1)[0][0]
-    most_common_value = value_counts.most_common()
-    second_elements = {x[1] for x in most_common_value}
-    if len(second_elements) == 1:
-        if min_flag:
-            most_common_value = most_common_value[0][0]
-        else:
-            most_common_value = most_common_value[-1][0]
+    # Количество повторений каждого значения одним проходом bincount
+    values_counts = np.bincount(values - values.min())
+    # Различные значения в порядке их первого появления в словаре
+    distinct_values, first_positions = np.unique(values, return_index=True)
+    distinct_values = distinct_values[np.argsort(first_positions)]
+    distinct_counts = values_counts[distinct_values - values.min()]
+    # Нахождение самого часто встречающегося значения (при равенстве - первого по порядку появления);
+    # если все значения встречаются одинаково часто, берется первое или последнее по порядку появления
+    if (distinct_counts == distinct_counts[0]).all():
+        most_common_value = distinct_values[0] if min_flag else distinct_values[-1]
     else:
-        most_common_value = most_common_value[0][0]
+        most_common_value = distinct_values[distinct_counts.argmax()]
+    most_common_value = int(most_common_value)
     # Выбор всех ключей, у которых значение равно самому часто встречающемуся
     keys_with_most_common_value = [key for key, value in some_dict.items() if value == most_common_value]
     # Нахождение минимального ключа
@@ -424,20 +533,25 @@ def parse_df_to_section(df):
     else:
         # Извлечение первого элемента из каждого кортежа и подсчет их количества
         # т.е. подсчет встречаемости заголовков в каждой строке
-        rows_of_found_headers = Counter(t[0] for t in headers_found_coordinates)
+        # (массив numpy: индекс - номер строки, значение - количество найденных заголовков)
+        rows_of_found_headers = np.bincount(np.fromiter((t[0] for t in headers_found_coordinates), dtype=np.intp,
+                                                        count=len(headers_found_coordinates)))
+        # Номера строк, в которых найден хотя бы один заголовок
+        rows_with_headers = set(np.flatnonzero(rows_of_found_headers).tolist())
         # Если заголовки, принадлежащие блоку информации о совершенных операциях найдены в одной строке
-        if len(rows_of_found_headers) == 1:
+        if len(rows_with_headers) == 1:
             headers_rows_count = 1
-            # Получение ключа из словаря
-            row_parting  = next(iter(rows_of_found_headers))
+            # Получение номера строки
+            row_parting = next(iter(rows_with_headers))
         # Если заголовки, принадлежащие блоку информации о совершенных операциях найдены в нескольких строках
         else:
             headers_rows_count = 2
             step = 1
             # Находим индекс строки, в которой наибольшее количество совпадений по заголовкам
-            max_row_index_of_headers_presence = max(rows_of_found_headers, key=rows_of_found_headers.get)
+            # (при равенстве количества argmax возвращает меньший номер строки)
+            max_row_index_of_headers_presence = int(rows_of_found_headers.argmax())
             # Проверяем присутствие индексов строк выше и ниже
-            rows_range_of_headers_presence = get_unit_from_key(rows_of_found_headers, max_row_index_of_headers_presence, step)
+            rows_range_of_headers_presence = get_unit_from_key(rows_with_headers, max_row_index_of_headers_presence, step)
             # Если вернулось 2 индекса строк
             if len(rows_range_of_headers_presence) == 2:
                 # Получение значений по выбранным ключам
@@ -480,35 +594,56 @@ def get_unit_from_key(some_dict, start_key, unit):
         selected_keys.append(start_key - unit)
     return selected_keys
 
-# delete_symbols_from_string функция удаления переданных символов из строки
-def delete_symbols_from_string(str_to_clean, chars_to_remove):
-    # Создание таблицы перевода
-    trans_table = str.maketrans('/', ' ', chars_to_remove)
-    # Удаление символов из строки
-    cleaned_string = str_to_clean.translate(trans_table)
-    return cleaned_string
+# iter_filled_cells функция обхода непустых ячеек DataFrame по строкам без поячеечного обращения к pandas
+# возвращает итератор кортежей (индекс строки, номер столбца, значение ячейки)
+def iter_filled_cells(df):
+    values = df.to_numpy(dtype=object)
+    rows, cols = np.nonzero(pd.notna(values))
+    return zip(rows.tolist(), cols.tolist(), values[rows, cols].tolist())
 
 # find_regex_in_df функция поиска в Dataframe значения, соответствующего переданному регулярному выражению
 # возвращает список кортежей с координатами соответствующих регулярному выражению значений.
 def find_regex_in_df(df, regex):
-    # Список для хранения координат ячеек с совпадениями
-    matches = []
-    # Проходим по каждой ячейке DataFrame
-    for row in range(len(df)): # for row in df.index:
-        # for col in df.columns:
-        for col in range(len(df.columns)):
-            cell_value = df.iat[row, col]
-            if pd.isna(cell_value):
-                # Если значение ячейки пустое, то переходим к следующей ячейке
-                continue
-            # Преобразуем значение ячейки в строку
-            cell_value = str(cell_value)
-            cell_value = delete_symbols_from_string(cell_value, "[().,-]")
-            # Если значение ячейки соответствует регулярному выражению
-            if re.search(regex, cell_value, re.IGNORECASE):
-                # Добавляем координаты ячейки (индекс строки и название столбца) в список совпадений
-                matches.append((row, col))
-    return matches
+    pattern_search = _compile(regex).search
+    # Значение ячейки приводим к строке, удаляем символы "[().,-]" и заменяем "/" на пробел,
+    # затем добавляем координаты ячеек (индекс строки и номер столбца), соответствующих регулярному выражению
+    return [
+        (row, col)
+        for row, col, cell_value in iter_filled_cells(df)
+        if pattern_search(str(cell_value).translate(_HEADER_CLEAN_TABLE))
+    ]
+
+# get_cleaned_filled_cells функция подготовки непустых ячеек DataFrame к поиску по регулярным выражениям:
+# значение ячейки приводится к строке, символы "[().,-]" удаляются, "/" заменяется на пробел (как в find_regex_in_df)
+# возвращает номера строк и столбцов (массивы numpy, по строкам) и список очищенных строк
+def get_cleaned_filled_cells(df):
+    values = df.to_numpy(dtype=object)
+    rows, cols = np.nonzero(pd.notna(values))
+    cleaned_values = [str(cell_value).translate(_HEADER_CLEAN_TABLE) for cell_value in values[rows, cols].tolist()]
+    return rows, cols, cleaned_values
+
+# find_first_regex_in_df функция поиска в Dataframe первых значений, соответствующих каждому
+# из переданных регулярных выражений, за один проход по ячейкам.
+# возвращает словарь {регулярное выражение: координаты первого совпадения (строка, столбец) или None}
+def find_first_regex_in_df(df, regexes, cleaned_cells=None):
+    first_matches = dict.fromkeys(regexes)
+    remaining = {regex: _compile(regex).search for regex in first_matches}
+    if not remaining:
+        return first_matches
+    rows, cols, cleaned_values = cleaned_cells if cleaned_cells is not None else get_cleaned_filled_cells(df)
+    # Объединенное выражение отсеивает ячейки, в которых нет ни одного совпадения, за одну проверку
+    union_search = _compile("|".join(f"(?:{regex})" for regex in remaining)).search
+    for row, col, cell_value in zip(rows.tolist(), cols.tolist(), cleaned_values):
+        if not union_search(cell_value):
+            continue
+        for regex, search in list(remaining.items()):
+            if search(cell_value):
+                first_matches[regex] = (row, col)
+                del remaining[regex]
+        if not remaining:
+            break
+        union_search = _compile("|".join(f"(?:{regex})" for regex in remaining)).search
+    return first_matches
 
 # def search_general_bank_info(df) - функция поиска общей информации выписки
 # возвращает словарь, состоящий из Искомых заголовков и соответствующих им значений
@@ -523,55 +658,54 @@ def search_general_bank_info(df, search_info_correlation) -> Tuple[Dict[str, Any
     col_and_value = {}
     errors = []
     try:
+        # Непустые ячейки приводятся к строкам и очищаются один раз для поиска всех заголовков и значений
+        cleaned_cells = get_cleaned_filled_cells(df)
+        # Координаты первых ячеек всех искомых заголовков за один проход по DataFrame
+        headers_first_coordinates = find_first_regex_in_df(df, search_info_correlation, cleaned_cells)
         for key, value in search_info_correlation.items():
-            # Список координат ячейки искомого заголовка
-            header_coordinates = find_regex_in_df(df, key)
+            # Координаты первой ячейки искомого заголовка
+            coordinate = headers_first_coordinates[key]
             # Если в файле не найден заголовок, то в словарь записываем:
             # "Искомый заголовок": "Заголовок не найден в выписке"
-            if not header_coordinates:
-                logger.info(f"Для заголовка: {value[0]} не найден соответствующий заголовок в файле!")
+            if coordinate is None:
+                logger.info("Для заголовка: %s не найден соответствующий заголовок в файле!", value[0])
                 col_and_value[value[0]] = "Заголовок не найден в выписке"
                 errors.append(ProcessingError(
                                     code=ResultMessages.WARNING_HEADERS_NOT_CORRECT.status_code,
                                     message=f"Заголовок: {value[0]} не найден в выписке",
                                     severity=ErrorSeverity.WARNING
                                 ))
-            # Если заголовок найден, берем его первые найденные координаты
+            # Если заголовок найден, используем его первые найденные координаты
             else:
-                coordinate = header_coordinates[0]
-                # Поиск значения (целиком), соответствующего заголовку, в прилегающих ячейках
-                search_df = get_narrow_search_area(df, coordinate)
-                col_and_value_cur, search_value_error = search_whole_value_around_header(search_df, value[0], value[1])
+                # Поиск значения (целиком), соответствующего заголовку, в прилегающих ячейках,
+                # а затем в прилегающих строках и строке заголовка - за один проход по этим строкам
+                search_df = get_wide_search_area(df, coordinate)
+                col_and_value_cur, search_value_error = search_whole_value_near_header(df, coordinate, value[0], value[1],
+                                                                                     cleaned_cells)
                 if search_value_error:
                     errors.extend(search_value_error)
                 if not col_and_value_cur:
-                    # Поиск значения (целиком), соответствующего заголовку, в прилегающих строках и строке заголовка
-                    search_df = get_wide_search_area(df, coordinate)
-                    col_and_value_cur, search_value_error = search_whole_value_around_header(search_df, value[0], value[1])
+                    # Поиск значения (разбитого по ячейкам), соответствующего заголовку, в прилегающих строках и строке заголовка
+                    col_and_value_cur, search_value_error = search_value_around_header(search_df, value[0], value[1])
                     if search_value_error:
                         errors.extend(search_value_error)
                     if not col_and_value_cur:
-                        # Поиск значения (разбитого по ячейкам), соответствующего заголовку, в прилегающих строках и строке заголовка
-                        col_and_value_cur, search_value_error = search_value_around_header(search_df, value[0], value[1])
-                        if search_value_error:
-                            errors.extend(search_value_error)
+                        # Поиск значения (целиком), соответствующего заголовку, непосредственно в ячейке заголовка
+                        # search_df = df.iloc[coordinate[0], coordinate[1]]
+                        match = _compile(value[1], 0).search(df.iloc[coordinate[0], coordinate[1]])
+                        if match:
+                            col_and_value_cur = {value[0]: match.group()}
+                        # Если значение не найдено, то в словарь записываем:
+                        # "Искомый заголовок": "Значение не найдено в выписке"
                         if not col_and_value_cur:
-                            # Поиск значения (целиком), соответствующего заголовку, непосредственно в ячейке заголовка
-                            # search_df = df.iloc[coordinate[0], coordinate[1]]
-                            match = re.search(value[1], df.iloc[coordinate[0], coordinate[1]])
-                            if match:
-                                col_and_value_cur = {value[0]: match.group()}
-                            # Если значение не найдено, то в словарь записываем:
-                            # "Искомый заголовок": "Значение не найдено в выписке"
-                            if not col_and_value_cur:
-                                logger.info(f"Для заголовка: {value[0]} не найдено значение!")
-                                # col_and_value[value[0]] = "Значение не найдено в выписке"
-                                col_and_value_cur = {value[0]: "Значение не найдено в выписке"}
-                                errors.append(ProcessingError(
-                                    code=ResultMessages.WARNING_HEADERS_NOT_CORRECT.status_code,
-                                    message=f"Значение заголовка: {value[0]} не найдено в выписке",
-                                    severity=ErrorSeverity.WARNING
-                                ))
+                            logger.info("Для заголовка: %s не найдено значение!", value[0])
+                            # col_and_value[value[0]] = "Значение не найдено в выписке"
+                            col_and_value_cur = {value[0]: "Значение не найдено в выписке"}
+                            errors.append(ProcessingError(
+                                code=ResultMessages.WARNING_HEADERS_NOT_CORRECT.status_code,
+                                message=f"Значение заголовка: {value[0]} не найдено в выписке",
+                                severity=ErrorSeverity.WARNING
+                            ))
                 col_and_value.update(col_and_value_cur)
     except Exception as e:
         search_error = ProcessingError(
@@ -601,31 +735,22 @@ def search_value_around_header(search_area, column_name, search_value_pattern) -
         seq_len = 3
     # Проходим по каждой ячейке DataFrame
     try:
-        for row in range(len(search_area)):
-            # Список для хранения ячеек с совпадениями
-            matches = []
-            match_num =  []
-            for col in range(len(search_area.columns)):
-                cell_value = search_area.iat[row, col]
-                if pd.isna(cell_value):
-                    if match_num:
-                        matches.append(match_num)
-                    match_num =  []
-                    # Если значение ячейки пустое, то переходим к следующей ячейке
-                    continue
-                # Преобразуем значение ячейки в строку
-                cell_value = str(cell_value)
-                cell_match_num = re.search(r'^[0-9](?=\.0|$)', cell_value, re.IGNORECASE)
-                # Если значение ячейки соответствует регулярному выражению
-                if cell_match_num:
-                    # Добавляем найденное значение в список совпадений
-                    match_num.append(cell_match_num.group())
-            matches.append(match_num)
-            # Вызываем функцию
-            strs_of_length_n = find_lists_of_length_n(matches, seq_len)
-            for str_n in strs_of_length_n:
-                if re.search(search_value_pattern, str_n, re.IGNORECASE):
-                     column_values[column_name] = str_n
+        digit_search = _compile(r'^[0-9](?=\.0|$)').search
+        value_search = _compile(search_value_pattern).search
+        # Значения и маска пустых ячеек извлекаются из DataFrame один раз
+        values = search_area.to_numpy(dtype=object)
+        isna = pd.isna(values)
+        # Ячейки кодируются байтом найденной цифры (ASCII), 255 - ячейка не является одиночной цифрой
+        codes = np.full(values.shape, 255, dtype=np.uint8)
+        rows, cols = np.nonzero(~isna)
+        for row, col, cell_value in zip(rows.tolist(), cols.tolist(), values[rows, cols].tolist()):
+            cell_match_num = digit_search(str(cell_value))
+            if cell_match_num:
+                codes[row, col] = ord(cell_match_num.group())
+        # Последовательности цифр нужной длины проверяются на соответствие паттерну значения
+        for str_n in _digit_runs(codes, isna, seq_len):
+            if value_search(str_n):
+                column_values[column_name] = str_n
     except Exception as e:
         search_value_error = ProcessingError(
             code=400,
@@ -636,23 +761,56 @@ def search_value_around_header(search_area, column_name, search_value_pattern) -
         errors.append(search_value_error)
     return column_values, errors
 
-# search_whole_value_around_col_name функция поиска значения в ограниченной области
-def search_whole_value_around_header(df_search, column_name, search_value_pattern) -> Tuple[Dict[str, Any], List[ProcessingError]]:
+# _digit_runs функция сборки значений, разбитых по ячейкам (по одной цифре в ячейке).
+# Последовательность прерывается пустой ячейкой и концом строки, непустые ячейки без цифры пропускаются
+# возвращает строки из seq_len цифр в порядке следования
+def _digit_runs(codes, isna, seq_len):
+    if codes.size == 0:
+        return []
+    # Номер отрезка: новый отрезок начинается с каждой строки и с каждой пустой ячейки
+    starts = isna.copy()
+    starts[:, 0] = True
+    segments = np.cumsum(starts.ravel())
+    flat_codes = codes.ravel()
+    digit_positions = np.flatnonzero(flat_codes != 255)
+    digit_segments = segments[digit_positions]
+    # Оставляем цифры только тех отрезков, в которых ровно seq_len цифр
+    selected = digit_positions[np.bincount(digit_segments)[digit_segments] == seq_len]
+    return [run.tobytes().decode('ascii') for run in flat_codes[selected].reshape(-1, seq_len)]
+
+# search_whole_value_near_header функция поиска значения (целиком) рядом с заголовком:
+# сначала в ближайших ячейках вокруг заголовка, затем в строке выше, строке заголовка и строке ниже (get_wide_search_area).
+# Области выбираются масками по координатам ячеек, каждая ячейка проверяется по паттерну не более одного раза
+def search_whole_value_near_header(df, header_coordinates, column_name, search_value_pattern,
+                                   cleaned_cells=None) -> Tuple[Dict[str, Any], List[ProcessingError]]:
     """
-    Поиск значения в ограниченной области с обработкой ошибок
+    Поиск значения рядом с заголовком с обработкой ошибок
 
     Returns:
     - Dict: Словарь найденных значений
     - List[ProcessingError]: Список ошибок обработки
     """
+    header_row, header_col = header_coordinates
     column_values = {}
     errors = []
     try:
-        # Поиск координат значения по паттерну в переданной области
-        cells_coordinates = find_regex_in_df(df_search, search_value_pattern)
-        # Если координаты найдены, берем первые и записываем найденное значение в словарь
-        if cells_coordinates:
-            column_values[column_name] = df_search.iloc[cells_coordinates[0]]
+        rows, cols, cleaned_values = cleaned_cells if cleaned_cells is not None else get_cleaned_filled_cells(df)
+        # Ближайшие ячейки: соседние строки и столбцы
+        near_mask = (np.abs(rows - header_row) <= 1) & (np.abs(cols - header_col) <= 1)
+        # Строки области get_wide_search_area (срез range повторяет срез iloc, в т.ч. для первой строки)
+        wide_rows = range(len(df))[header_row - 1:header_row + 2]
+        wide_mask = (rows >= wide_rows.start) & (rows < wide_rows.stop)
+        pattern_search = _compile(search_value_pattern).search
+        matched = {
+            position: bool(pattern_search(cleaned_values[position]))
+            for position in np.flatnonzero(near_mask | wide_mask).tolist()
+        }
+        # Позиции идут по строкам, поэтому первое совпадение - то же, что вернул бы find_regex_in_df
+        found = next((position for position in np.flatnonzero(near_mask).tolist() if matched[position]), None)
+        if found is None:
+            found = next((position for position in np.flatnonzero(wide_mask).tolist() if matched[position]), None)
+        if found is not None:
+            column_values[column_name] = df.iat[int(rows[found]), int(cols[found])]
     except Exception as e:
         search_value_error = ProcessingError(
             code=ResultMessages.WARNING_HEADERS_NOT_CORRECT.status_code,
@@ -663,69 +821,6 @@ def search_whole_value_around_header(df_search, column_name, search_value_patter
         errors.append(search_value_error)
     return column_values, errors
 
-# get_narrow_search_area функция определения области (поиска) вокруг заголовка,
-# область - ближайшие ячейки вокруг заголовка
-# для последующего поиска соответствующего этому заголовку значения
-def get_narrow_search_area(df, header_coordinates):
-    row = header_coordinates[0]
-    col = header_coordinates[1]
-    if len(df) > row == 0 and 0 == col < len(df.columns):
-        rows = (row, row + 1)
-        cols = (col, col + 1)
-    elif len(df) > row == 0 and 0 < col < len(df.columns):
-        rows = (row, row + 1)
-        cols = (col - 1, col + 1)
-    elif len(df) > row == 0 and 0 < col == len(df.columns):
-        rows = (row, row + 1)
-        cols = (col - 1, col)
-    elif len(df) > row > 0 and 0 < col == len(df.columns):
-        rows = (row - 1, row + 1)
-        cols = (col - 1, col)
-    elif len(df) == row > 0 and 0 < col == len(df.columns):
-        rows = (row - 1, row)
-        cols = (col - 1, col)
-    elif len(df) == row > 0 and 0 < col < len(df.columns):
-        rows = (row - 1, row)
-        cols = (col - 1, col + 1)
-    elif len(df) == row > 0 and 0 == col < len(df.columns):
-        rows = (row - 1, row)
-        cols = (col, col + 1)
-    elif len(df) > row > 0 and 0 == col < len(df.columns):
-        rows = (row - 1, row + 1)
-        cols = (col, col + 1)
-    elif len(df) > row > 0 and 0 < col < len(df.columns):
-        rows = (row - 1, row + 1)
-        cols = (col - 1, col + 1)
-    # Однострочный фрейм
-    elif len(df) == 1 and 0 == col < len(df.columns):
-        rows = (row, row)
-        cols = (col, col + 1)
-    elif len(df) == 1 and 0 < col < len(df.columns):
-        rows = (row, row)
-        cols = (col - 1, col + 1)
-    elif len(df) == 1 and 0 < col == len(df.columns):
-        rows = (row, row)
-        cols = (col - 1, col)
-    # Одноколоночный фрейм
-    elif len(df.columns) == 1 and 0 == row < len(df):
-        rows = (row, row + 1)
-        cols = (col, col)
-    elif len(df.columns) == 1 and 0 < row < len(df):
-        rows = (row - 1, row + 1)
-        cols = (col, col)
-    elif len(df.columns) == 1 and 0 < row == len(df):
-        rows = (row - 1, row)
-        cols = (col, col)
-    # len(df.columns) == 1 and len(df) == 1:
-    else:
-        rows = (row, row)
-        cols = (col, col)
-    # Преобразование в срезы
-    row_slice = slice(rows[0], rows[1] + 1)
-    col_slice = slice(cols[0], cols[1] + 1)
-    search_area = df.iloc[row_slice, col_slice]
-    return search_area
-
 # get_wide_search_area функция определения области (поиска) вокруг заголовка,
 # область - строка выше заголовка, строка заголовка, строка ниже заголовка
 # для последующего поиска соответствующего этому заголовку значения
@@ -736,27 +831,48 @@ def get_wide_search_area(df, header_coordinates):
 
 # clean_dataframe(df) функция очистки DataFrame от пустых столбцов и строк,
 # а также удаление строк, удовлетворяющих указанным значениям
-def clean_dataframe(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
+def clean_dataframe(df, already_cleaned=False) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     """
     Очистка DataFrame от пустых столбцов и строк с обработкой ошибок
 
+    already_cleaned=True - df является срезом строк уже очищенного DataFrame: пустых строк и переносов
+    в нем нет, поэтому удаляются только столбцы, пустые в этом срезе, и строки с номерами столбцов
+
     Returns:
     - DataFrame: Очищенный DataFrame
     - List[ProcessingError]: Список ошибок обработки
     """
     errors = []
     try:
+        # Маски пустых столбцов, пустых строк и строк с номерами столбцов вычисляются по одному массиву значений,
+        # результат выбирается одним iloc, без промежуточных DataFrame на каждом шаге
+        values = df.to_numpy()
+        filled = df.notna().to_numpy()
         # Удаление пустых столбцов
-        df =df.dropna(axis=1, how='all')
-        # Сбрасываем индекс столбцов, присваивая новые метки
-        df.columns = range(df.shape[1])
+        columns_to_keep = np.flatnonzero(filled.any(axis=0))
         # Удаление пустых строк
-        df = df.dropna(axis=0, how='all').reset_index(drop=True)
+        if already_cleaned:
+            rows_to_keep = np.arange(len(df))
+        else:
+            rows_to_keep = np.flatnonzero(filled.any(axis=1))
         # Проверяем каждую строку на соответствие последовательности от 1 до общ кол-ва столбцов
-        df = clean_sequential_columns_numbers(df)
+        sequential_mask = sequential_columns_numbers_mask(values[np.ix_(rows_to_keep, columns_to_keep)])
+        df = df.iloc[rows_to_keep[~sequential_mask], columns_to_keep].reset_index(drop=True)
+        # Сбрасываем индекс столбцов, присваивая новые метки
+        df.columns = range(df.shape[1])
         # Заменяем \n на пустую строку во всем датафрейме
-        pd.set_option('future.no_silent_downcasting', True)
-        df = df.replace(r'\n', ' ', regex=True)
+        if not already_cleaned:
+            # Перенос строки может быть только в строковых значениях: столбцы без переносов не изменяются,
+            # в остальных замена выполняется без regex и только в ячейках с переносом
+            for col in df.select_dtypes(include='object').columns:
+                values = df[col]
+                has_newline = np.fromiter(
+                    (type(value) is str and '\n' in value for value in values.to_numpy()), dtype=bool, count=len(values)
+                )
+                if has_newline.any():
+                    df[col] = values.mask(has_newline, values[has_newline].str.replace('\n', ' ', regex=False))
+        # Как и прежний DataFrame.replace, приводим столбцы object к выводимым типам (например, только числа -> int64)
+        df = df.infer_objects()
     except Exception as e:
         cleaning_error = ProcessingError(
             code=ResultMessages.ERROR_DATAFRAME_CLEANUP_FAILED.status_code,
@@ -771,28 +887,18 @@ def clean_dataframe(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
 # удаление пустых подзаголовков
 def flatten_headers(df) -> List[str]:
     # Предположим, что df уже содержит данные, включая две строки заголовков
-    # инициализируем новые заголовки пустым списком
-    new_headers = []
-    # Проверяем первую строку и копируем значения слева направо, если справа NaN.
-    for col in range(1, len(df.columns)):  # Начинаем с 1, потому что 0-ой столбец не имеет предшественника
-        if pd.isnull(df.iloc[0, col]):
-            df.iloc[0, col] = df.iloc[0, col-1]
-    # Итерируем по столбцам
-    for col in range(len(df.columns)):
-        # Для столбцов, где первая строка не является NaN, и вторая строка содержит значение
-        if pd.notnull(df.iloc[0, col]) and pd.notnull(df.iloc[1, col]):
-            # Объединяем значения из первой и второй строки
-            new_header = f"{df.iloc[0, col]} {df.iloc[1, col]}"
-        # Для столбцов, где первая строка не является NaN, но вторая строка - NaN
-        elif pd.notnull(df.iloc[0, col]):
-            # Используем значение из первой строки
-            new_header = df.iloc[0, col]
-        # Для столбцов, где первая строка - NaN
-        else:
-            # Используем значение из второй строки (или другую логику, если нужно)
-            new_header = df.iloc[1, col]
-        new_headers.append(new_header)
-    return new_headers
+    # Обе строки заголовков извлекаются из DataFrame одним массивом 2 x ncols, без поячеечного обращения через iloc
+    first_row, second_row = df.iloc[:2].to_numpy(dtype=object)
+    # Копируем значения первой строки слева направо, если справа NaN (ffill по индексу последней заполненной ячейки)
+    filled_positions = np.where(pd.notna(first_row), np.arange(len(first_row)), 0)
+    first_row = first_row[np.maximum.accumulate(filled_positions)] if len(first_row) else first_row
+    # Для столбцов, где заполнены обе строки, объединяем значения из первой и второй строки,
+    # где заполнена только первая - используем ее значение, иначе - значение из второй строки
+    return [
+        f"{top} {bottom}" if top_filled and bottom_filled else (top if top_filled else bottom)
+        for top, bottom, top_filled, bottom_filled
+        in zip(first_row.tolist(), second_row.tolist(), pd.notna(first_row).tolist(), pd.notna(second_row).tolist())
+    ]
 
 # correct_df_headers функция исправления названий столбцов, полученных из входящих файлов
 # в названия переменных, соответствующих столбцам исходящего файла
@@ -807,54 +913,47 @@ def correct_df_headers(df, headers_count) -> Tuple[pd.DataFrame, pd.DataFrame, L
         """
         errors = []
     # try:
-        headers_rows = df.iloc[:headers_count].copy()
         if headers_count == 2:
-            original_columns = flatten_headers(headers_rows)
+            # flatten_headers только читает строки заголовков, копия среза не нужна
+            original_columns = flatten_headers(df.iloc[:headers_count])
             count_of_row_to_del = 2
         else:
-            original_columns = df.iloc[0].tolist()
+            # Первая строка берется из массива значений среза, без построения Series строки
+            original_columns = df.iloc[:1].to_numpy()[0].tolist()
             count_of_row_to_del = 1
 
-        headers_correlation = {
-            SEQ_NUMBER_PATTERN: SEQ_NUMBER,
-            OPERATION_DATE_PATTERN: DOCUMENT_OPERATION_DATE,
-            DOCUMENT_TYPE_CODE_PATTERN: DOCUMENT_TYPE_CODE,
-            DOCUMENT_NUMBER_PATTERN: DOCUMENT_NUMBER,
-            DOCUMENT_DATE_PATTERN: DOCUMENT_DATE,
-            CORESPONDENT_ACCOUNT_NUMBER_PATTERN: CORESPONDENT_ACCOUNT_NUMBER,
-            PAYER_OR_RECIPIENT_BANK_PATTERN: PAYER_OR_RECIPIENT_BANK,
-            BANK_BIK_PATTERN: BANK_BIK,
-            PAYER_OR_RECIPIENT_NAME_PATTERN: PAYER_OR_RECIPIENT_NAME,
-            PAYER_OR_RECIPIENT_INN_PATTERN: PAYER_OR_RECIPIENT_INN,
-            PAYER_OR_RECIPIENT_KPP_PATTERN: PAYER_OR_RECIPIENT_KPP,
-            ACCOUNT_NUMBER_PATTERN: ACCOUNT_NUMBER,
-            DEBIT_AMOUNT_PATTERN: DEBIT_AMOUNT,
-            CREDIT_AMOUNT_PATTERN: CREDIT_AMOUNT,
-            PAYMENT_PURPOSE_PATTERN: PAYMENT_PURPOSE
-        }
-        count_of_obligatory_headers = len(headers_correlation)
-        obligatory_headers = set(headers_correlation.values())
-        # Определение символов для удаления
-        chars_to_remove = "[().,-]"
+        count_of_obligatory_headers = len(_BANK_STATEMENT_HEADER_SEARCHES)
 
-        extra_columns = list(range(len(original_columns)))
         new_columns = original_columns.copy()
-
-        for index, original_col in enumerate(original_columns):
-            for key, value in headers_correlation.items():
-                cleaned_col = delete_symbols_from_string(original_col, chars_to_remove)
-                if re.search(key, cleaned_col, re.IGNORECASE):
-                    # Ищем в списке new_columns элемент, равный original_col, и заменяем его по индексу на value
-                    new_columns[index] = value
-                    del headers_correlation[key]
-                    extra_columns.remove(index)
-                    break
-                else:
-                    continue
+        # Заголовки очищаются один раз, а не для каждого шаблона: символы "[().,-]" удаляются
+        # готовой таблицей перевода
+        cleaned_columns = [original_col.translate(_HEADER_CLEAN_TABLE) for original_col in original_columns]
+
+        # Номера еще не найденных заголовков (dict как упорядоченное множество: порядок задает приоритет паттернов)
+        remaining_headers = dict.fromkeys(range(count_of_obligatory_headers))
+        matched_columns = set()
+        for index, cleaned_col in enumerate(cleaned_columns):
+            # Один проход объединенного паттерна: если он не совпал, ни один из паттернов не совпадет
+            union_match = _BANK_STATEMENT_HEADERS_UNION_SEARCH(cleaned_col)
+            if union_match is None:
+                continue
+            # Паттерн, совпадение с которым уже найдено, повторно не проверяется
+            matched_index = int(union_match.lastgroup[1:])
+            # Первый из еще не найденных заголовков, паттерн которого соответствует заголовку столбца
+            found = next((header_index for header_index in remaining_headers
+                          if header_index == matched_index
+                          or _BANK_STATEMENT_HEADER_SEARCHES[header_index][0](cleaned_col)), None)
+            if found is not None:
+                new_columns[index] = _BANK_STATEMENT_HEADER_SEARCHES[found][1]
+                del remaining_headers[found]
+                matched_columns.add(index)
+        # Не найденные в выписке заголовки и дополнительные (не сопоставленные) столбцы
+        not_found_headers = [_BANK_STATEMENT_HEADER_SEARCHES[header_index][1] for header_index in remaining_headers]
+        extra_columns = [index for index in range(len(original_columns)) if index not in matched_columns]
         # Если все обязательные заголовки найдены в выписке, НО выписка содержит дополнительные столбцы
         # Если НЕ все обязательные заголовки нашлись в выписке (часть найдена, часть нет)
-        if ((not headers_correlation and count_of_obligatory_headers < len(original_columns))
-                or (headers_correlation and count_of_obligatory_headers > len(headers_correlation))):
+        if ((not not_found_headers and count_of_obligatory_headers < len(original_columns))
+                or (not_found_headers and count_of_obligatory_headers > len(not_found_headers))):
             if extra_columns:
             # Удаляем дополнительные столбцы
                 try:
@@ -870,32 +969,36 @@ def correct_df_headers(df, headers_count) -> Tuple[pd.DataFrame, pd.DataFrame, L
                         severity=ErrorSeverity.CRITICAL,
                         details={"exception": str(e)}
                     )
-                    logger.error(f" При удалении дополнительных столбцов возникла ошибка: {header_correction_error.message}: {str(e)}")
+                    logger.error(" При удалении дополнительных столбцов возникла ошибка: %s: %s", header_correction_error.message, e)
                     errors.append(header_correction_error)
                     return df, pd.DataFrame(), errors
                 else:
-                    # Фильтрация списка new_columns, чтобы оставить только те элементы, которые есть в obligatory_headers
-                    new_columns = [column for column in new_columns if column in obligatory_headers]
+                    # Фильтрация списка new_columns, чтобы оставить только обязательные заголовки
+                    # (одна проверка np.isin; заголовки сравниваются как строки, т.к. исходные могут быть NaN или числами)
+                    is_obligatory = np.isin(np.array(new_columns, dtype=str), _BANK_STATEMENT_HEADERS_ARRAY)
+                    new_columns = [column for column, keep in zip(new_columns, is_obligatory.tolist()) if keep]
             df.columns = new_columns
         # Если все обязательные заголовки найдены в выписке
-        elif not headers_correlation and count_of_obligatory_headers == len(new_columns):
+        elif not not_found_headers and count_of_obligatory_headers == len(new_columns):
             df.columns = new_columns
         # Если НЕ все обязательные заголовки нашлись в выписке (часть найдена, часть нет)
-        if headers_correlation:
+        if not_found_headers:
             # Задаем значения для не найденных заголовков
             col_and_value = {}
-            logger.info(f"Заголовки {headers_correlation.values()} не найдены")
-            for hd in headers_correlation.values():
+            logger.info("Заголовки %s не найдены", not_found_headers)
+            for hd in not_found_headers:
                 col_and_value[hd] = "Заголовок не найден в выписке"
                 errors.append(ProcessingError(
                                     code=ResultMessages.WARNING_HEADERS_NOT_CORRECT.status_code,
                                     message=f"Заголовок {hd} не найден в выписке",
                                     severity=ErrorSeverity.WARNING
                                 ))
-            for col, val in col_and_value.items():
-                    df[col] = val
-        # Выбираем строки оригинальных заголовков
-        df_with_origin_headers = df.iloc[:count_of_row_to_del].copy()
+            # Все недостающие столбцы добавляются одним concat, а не вставкой каждого столбца в df по очереди
+            # (совпасть с имеющимися столбцами они не могут: найденные заголовки и номера столбцов отличаются от них)
+            df = pd.concat([df, pd.DataFrame(col_and_value, index=df.index)], axis=1)
+        # Выбираем строки оригинальных заголовков (срез без копии: далее он только читается при удалении
+        # повторов заголовков, а df после этого заменяется новым объектом и не изменяется)
+        df_with_origin_headers = df.iloc[:count_of_row_to_del]
         # Удаляем первые строки, которые были идентифицированы как заголовки
         df = df.iloc[count_of_row_to_del:].reset_index(drop=True)
 
@@ -911,11 +1014,16 @@ def clean_headers_in_bank_statement(df, headers_df) -> Tuple[pd.DataFrame, List[
     """
     errors = []
     try:
-        # Объединим df1 и df2 с помощью outer join и добавим индикатор
-        merged_df = df.merge(headers_df, how='outer', indicator=True)
-
-        # Фильтруем строки, которые есть только в df1
-        filtered_df = merged_df[merged_df['_merge'] == 'left_only'].drop(columns=['_merge'])
+        # Строки df, совпадающие со строкой заголовков, удаляются (anti-join по кортежам значений строк)
+        is_header_row = pd.MultiIndex.from_frame(df).isin(pd.MultiIndex.from_frame(headers_df[df.columns]))
+        filtered_df = df[~is_header_row]
+        # Порядок строк как в результате outer join: по значениям столбцов слева направо, равные - в исходном порядке;
+        # если значения столбца несравнимы между собой (строки и числа), сохраняется исходный порядок
+        try:
+            filtered_df = filtered_df.sort_values(list(filtered_df.columns), kind='stable')
+        except TypeError:
+            pass
+        filtered_df = filtered_df.reset_index(drop=True)
     except Exception as e:
         headers_in_bank_statement_error = ProcessingError(
             code=400,
@@ -940,7 +1048,9 @@ def clean_agregate_rows(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
         # Рассчитываем минимальное количество непропущенных значений для сохранения
         thresh = len(df.columns) // 2 + 1
         # Удаляем строки, заполненные меньше чем на половину
-        cleaned_df = df.dropna(thresh=thresh).reset_index(drop=True)
+        # (заполненность считается одним numpy-суммированием по маске, а не блоками dropna)
+        keep = df.notna().to_numpy().sum(axis=1) >= thresh
+        cleaned_df = df[keep].reset_index(drop=True)
     except Exception as e:
         agregate_rows_error = ProcessingError(
             code=400,
@@ -952,36 +1062,59 @@ def clean_agregate_rows(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
         return df, errors
     return cleaned_df, errors
 
+def sequential_columns_numbers_mask(values):
+    # Маска строк массива значений, соответствующих последовательности от 1 до общ кол-ва столбцов
+    # (значения сравниваются по столбцам, как их видит построчный обход;
+    # если ни одна строка уже не подходит, остальные столбцы не проверяются)
+    mask = np.ones(len(values), dtype=bool)
+    for col in range(values.shape[1]):
+        mask &= values[:, col].astype(str) == str(col + 1)
+        if not mask.any():
+            break
+    return mask
+
 def clean_sequential_columns_numbers(df):
     # Проверяем каждую строку на соответствие последовательности от 1 до общ кол-ва столбцов
     # Создаем маску для строк, которые нужно удалить
-    mask = df.apply(lambda row: np.array_equal(row.values.astype(str), [str(i) for i in range(1, len(row)+1)]), axis=1)
+    mask = sequential_columns_numbers_mask(df.to_numpy())
     # Удаление строк, соответствующих маске
     df = df[~mask].reset_index(drop=True)
     return df
 
 # validate_and_log(value, pattern, column_name) функция валидации значения в столбце,
 # согласно указанному шаблону
-def validate_and_log(value, pattern, column_name):
-    if re.match(pattern, str(value)) is None:
-        logger.warning(f'Значение "{value}" в столбце {column_name} не прошло валидацию')
-        return f'Not valid value: "{value}"'
-    return value
-
-# convert_to_float(value) функция преобразования строки в число с плавающей точкой
-def convert_to_float(value, column_name):
-    # Проверка соответствия значения паттерну "число.число или число" с помощью регулярного выражения
-    if re.match(r'^\d+(\.\d+)?$', value):
-        return float(value)
-    # Проверка соответствия значения паттерну "число-число" с помощью регулярного выражения
-    elif re.match(r'^\d+-\d+$', value):
-        # Замена дефиса на точку для получения формата числа с плавающей точкой
-        converted_value = value.replace('-', '.')
-        # Преобразование строки в число с плавающей точкой
-        return float(converted_value)
-    else:
-        logger.warning(f'Значение "{value}" в столбце {column_name} не прошло валидацию')
-        return f'Not valid value: "{value}"'
+# Значения столбца (строки) проверяются одним векторным вызовом, невалидные заменяются на 'Not valid value: "..."'
+def validate_and_log(values, pattern, column_name):
+    is_valid = values.str.match(_compile(pattern, 0))
+    for value in values[~is_valid]:
+        logger.warning('Значение "%s" в столбце %s не прошло валидацию', value, column_name)
+    return values.where(is_valid, 'Not valid value: "' + values + '"')
+
+# convert_to_float(values) функция преобразования значений столбца (строк) в числа с плавающей точкой
+# одним векторным вызовом, не прошедшие валидацию значения заменяются на 'Not valid value: "..."'
+def convert_to_float(values, column_name):
+    # Проверка соответствия значения паттерну "число.число или число"
+    is_float = values.str.match(_FLOAT_VALUE_RE)
+    # Проверка соответствия значения паттерну "число-число" (дефис заменяется на точку)
+    is_dashed_float = values.str.match(_DASHED_FLOAT_VALUE_RE)
+    is_valid = is_float | is_dashed_float
+    for value in values[~is_valid]:
+        logger.warning('Значение "%s" в столбце %s не прошло валидацию', value, column_name)
+    converted = ('Not valid value: "' + values + '"').astype(object)
+    converted[is_valid] = values.mask(is_dashed_float, values.str.replace('-', '.', regex=False))[is_valid].astype(float)
+    # Как и при поэлементном преобразовании: столбец только из чисел получает тип float
+    return converted.infer_objects()
+
+# Строковые представления пропусков в столбце, приведенном к str: по ним формат дат не определяется
+_MISSING_DATE_STRINGS = frozenset(("NaT", "nat", "NAT", "NaN", "nan", "NAN", "None", ""))
+
+# detect_date_format(values) функция определения формата дат столбца по первому непустому значению
+# возвращает формат для pd.to_datetime или None, если формат не из таблицы _DATE_FORMATS
+def detect_date_format(values):
+    sample = next((value for value in values if value not in _MISSING_DATE_STRINGS), None)
+    if sample is None:
+        return None
+    return next((date_format for date_regex, date_format in _DATE_FORMATS if date_regex.match(sample)), None)
 
 # validate_df_columns(df) функция валидации столбцов DataFrame с приведением к нужному типу и формату
 def validate_df_columns(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
@@ -995,9 +1128,9 @@ def validate_df_columns(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
     errors = []
     for col in df.columns:
         if df[col].dtype == float:
-            df[col] = df[col].astype(str)
+            values = df[col].astype(str)
             # Удаляем десятичную часть, если она равна 0
-            df[col] = df[col].apply(lambda x: x.split('.')[0] if x.split('.')[1] == '0' else x)
+            df[col] = values.mask(values.str.endswith('.0'), values.str.slice(stop=-2))
         else:
             df[col] = df[col].astype(str)
         col_len = 0
@@ -1007,7 +1140,7 @@ def validate_df_columns(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
                 col_len = 2
             case 'payer_or_recipient_inn':
                 col_pattern = '^[0-9]{10,12}$'
-                df[col] = df[col].apply(lambda x: '0' + x if (len(x) == 9 or len(x) == 11) else x)
+                df[col] = df[col].mask(df[col].str.len().isin((9, 11)), '0' + df[col])
             case 'payer_or_recipient_kpp':
                 col_pattern = '^[0-9]{9}$'
                 col_len = 9
@@ -1016,42 +1149,34 @@ def validate_df_columns(df) -> Tuple[pd.DataFrame, List[ProcessingError]]:
             case 'debit_amount' | 'credit_amount':
                 df[col] = df[col].replace('nan', '0')
                 df[col] = df[col].replace('-', '0')
-                df[col] = df[col].apply(lambda x: convert_to_float(x, col))
+                df[col] = convert_to_float(df[col], col)
             case 'correspondent_account_number':
                 col_pattern = '^301[02][145][0-9]{15}$'
             case 'bank_bik':
                 col_pattern = '^[012][0-9]{8}$'
                 col_len = 9
             case 'document_operation_date' | 'document_date':
-                df[col] = pd.to_datetime(df[col], dayfirst=True, infer_datetime_format=True)
+                # Формат определяется один раз по первому значению, разбор с явным форматом идет по быстрому пути
+                df[col] = pd.to_datetime(df[col], format=detect_date_format(df[col]), dayfirst=True, cache=True)
             case _:
                 print("Other")
         if col_len != 0:
             # Добавляем ведущий ноль, если длина строки меньше положенной
-            df[col] = df[col].apply(lambda x: '0' + x if len(x) == col_len-1 else x)
+            df[col] = df[col].mask(df[col].str.len() == col_len - 1, '0' + df[col])
         # Проверка валидации по заданному паттерну
         if col_pattern != '':
-            df[col] = df[col].apply(lambda x: validate_and_log(x, col_pattern, col))
+            df[col] = validate_and_log(df[col], col_pattern, col)
     return df, errors
 
 def find_regex_in_df2(df, regex, index):
-    presupposed_headers_position = {}
-    for i in range(index, -1, -1):
-        match_list = []
-        for col in range(len(df.columns)):
-            cell_value = df.iat[i, col]
-            if not pd.isna(cell_value):
-                cell_value = str(cell_value)
-                cell_value = delete_symbols_from_string(cell_value, "[().,-]")
-                cell_match_num = re.search(regex, cell_value, re.IGNORECASE)
-                if cell_match_num:
-                    match_list.append(1)
-                else:
-                    match_list.append(0)
-        presupposed_headers_position[i] = sum(match_list)
-    # Удаление элементов со значением 0
-    cleaned_dict = {key: value for key, value in presupposed_headers_position.items() if value != 0}
-    return cleaned_dict
+    pattern_search = _compile(regex).search
+    # Ячейки строк 0..index очищаются так же, как в find_regex_in_df, пустые ячейки не перебираются
+    rows, _, cleaned_values = get_cleaned_filled_cells(df.iloc[:index + 1])
+    matched_rows = [row for row, cell_value in zip(rows.tolist(), cleaned_values) if pattern_search(cell_value)]
+    # Количество совпадений в каждой строке одним вызовом np.bincount
+    presupposed_headers_position = np.bincount(np.array(matched_rows, dtype=np.intp), minlength=index + 1)
+    # Строки без совпадений не возвращаются, порядок - от строки index к первой строке
+    return {i: int(presupposed_headers_position[i]) for i in range(index, -1, -1) if presupposed_headers_position[i]}
 
 # parse_fns_df функция парсинга DataFrame на логические области:
 # 1 - Общая информация Выписки
@@ -1075,15 +1200,16 @@ def parse_fns_df_format(file_df):
 # def read_excel функция определения формата выписки
 def detect_file_type(df):
     file_format = ''
-    found = ()
     search_fns = ['ММВ-7-2/519@','ММВ-7-2/679@']
+    # Значения первых 15 строк объединяются в одну строку (разделитель \n в искомых значениях не встречается),
+    # искомые значения не содержат спецсимволов регулярных выражений, поэтому достаточно поиска подстроки
+    joined_values = '\n'.join(df.iloc[:15].astype(str).to_numpy().ravel().tolist())
     for search in search_fns:
-        found = df.iloc[:15].apply(lambda row: row.astype(str).str.contains(search), axis=1).any(axis=1)
-        if found.any():
+        if search in joined_values:
             file_format = 'FNS'
             logger.info('found file FNS-format')
             break
-    if not found.any():
+    else:
         logger.info('found file another-format')
     return file_format
 
@@ -1111,15 +1237,11 @@ def convert_xls_to_xlsx(input_file):
         xls_data.to_excel(xlsx_data, index=False, engine='openpyxl')
         xlsx_data.seek(0)
 
-        logger.info(f"Файл {input_file} успешно конвертирован в формат .xlsx!")
+        logger.info("Файл %s успешно конвертирован в формат .xlsx!", input_file)
         with open("files/output.xlsx", "wb") as file:
             file.write(xlsx_data.getvalue())
 
         return xlsx_data
     except Exception as e:
-        logger.error(f"Ошибка при конвертации файла {input_file}: {str(e)}")
+        logger.error("Ошибка при конвертации файла %s: %s", input_file, e)
         raise
-
-def find_lists_of_length_n(nested_lists, n):
-    # Используем генератор списков для нахождения всех списков длиной n
-    return [''.join(sublist)  for sublist in nested_lists if len(sublist) == n]
\ No newline at end of file
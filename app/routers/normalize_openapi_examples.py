@@ -0,0 +1,295 @@
+# OpenAPI examples of /normalize/parse responses: built once on import and shared with the route decorator
+
+PARSE_RESPONSES = {
+    200: {
+        "description": "Успешная нормализация банковской выписки",
+        "content": {
+            "application/json": {
+                "example": {
+                    "status_code": 200,
+                    "message": "File processed successfully",
+                    "status": "success",
+                    "data": {
+                        "schema": {
+                            "fields": [
+                                {
+                                    "name": "index",
+                                    "type": "integer"
+                                },
+                                {
+                                    "name": "No",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "document_operation_date",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "document_type_code",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "document_number",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "document_date",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "correspondent_account_number",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "payer_or_recipient_bank",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "bank_bik",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "payer_or_recipient_name",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "payer_or_recipient_inn",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "payer_or_recipient_kpp",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "account_number",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "debit_amount",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "credit_amount",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "payment_purpose",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "debtor_account_number",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "currency_code",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "debtor_bank_name",
+                                    "type": "string"
+                                },
+                                {
+                                    "name": "debtor_name",
+                                    "type": "string"
+                                }
+                            ],
+                            "primaryKey": [
+                                "index"
+                            ],
+                            "pandas_version": "1.4.0"
+                        },
+                        "data": [
+                            {
+                                "index": 0,
+                                "No": "1",
+                                "document_operation_date": "05.04.2022",
+                                "document_type_code": "01",
+                                "document_number": "695",
+                                "document_date": "04.04.2022",
+                                "correspondent_account_number": "30101810300000000881",
+                                "payer_or_recipient_bank": "Ф-л Приволжский ПАО Банк \"ФК Открытие\"",
+                                "bank_bik": "042282881",
+                                "payer_or_recipient_name": "ООО \"АЭС ИНВЕСТ\"",
+                                "payer_or_recipient_inn": "7453169760",
+                                "payer_or_recipient_kpp": "745101001",
+                                "account_number": "40702810602700003531",
+                                "debit_amount": "0-00",
+                                "credit_amount": "163955130-53",
+                                "payment_purpose": "Перевод остатка согласно заявления клиента на закрытие счета. Без НДС.",
+                                "debtor_account_number": "40702810101220500676",
+                                "currency_code": "810",
+                                "debtor_bank_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
+                                "debtor_name": "ООО \"АЭС ИНВЕСТ\""
+                            }
+                        ]
+                    },
+                    "file_path": "/app/uploads/9b2e4f7a1c3d5e6f8a0b2c4d6e8f0a1b/40702810101220500676%20%20%D1%81%2030.03.2022-output.xlsx",
+                    "download_url": "/normalize/download/9b2e4f7a1c3d5e6f8a0b2c4d6e8f0a1b/40702810101220500676%20%20%D1%81%2030.03.2022-output.xlsx",
+                    "errors": "null",
+                    "warnings": "null"
+                }
+            }
+        }
+    },
+    299: {
+        "description": "Файл обработан с предупреждениями",
+        "content": {
+            "application/json": {
+                "example":
+                    {
+                        "status_code": 299,
+                        "message": "File processed with warnings",
+                        "status": "success_with_warnings",
+                        "data": {
+                            "schema": {
+                                "fields": [
+                                    {
+                                        "name": "index",
+                                        "type": "integer"
+                                    },
+                                    {
+                                        "name": "document_operation_date",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "document_type_code",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "document_number",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "document_date",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "correspondent_account_number",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "payer_or_recipient_bank",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "bank_bik",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "payer_or_recipient_name",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "payer_or_recipient_inn",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "payer_or_recipient_kpp",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "account_number",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "debit_amount",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "credit_amount",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "payment_purpose",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "No",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "debtor_account_number",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "currency_code",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "debtor_bank_name",
+                                        "type": "string"
+                                    },
+                                    {
+                                        "name": "debtor_name",
+                                        "type": "string"
+                                    }
+                                ],
+                                "primaryKey": [
+                                    "index"
+                                ],
+                                "pandas_version": "1.4.0"
+                            },
+                            "data": [
+                                {
+                                    "index": 0,
+                                    "document_operation_date": "01.04.2024",
+                                    "document_type_code": "17",
+                                    "document_number": "335248",
+                                    "document_date": "01.04.2024",
+                                    "correspondent_account_number": "30101810600000000770",
+                                    "payer_or_recipient_bank": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
+                                    "bank_bik": "048073770",
+                                    "payer_or_recipient_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
+                                    "payer_or_recipient_inn": "0274062111",
+                                    "payer_or_recipient_kpp": "027802001",
+                                    "account_number": "47426810400004070904",
+                                    "debit_amount": "0-00",
+                                    "credit_amount": "7039560-14",
+                                    "payment_purpose": "Выплата начисленных процентов за п-д с 13.03.2024 по 31.03.2024 по счету '40702810101220500676' согласно договору банковского счета №40702810101220500676 от '30/03/2022' НДС не предусмотрен.",
+                                    "No": "Заголовок не найден в выписке",
+                                    "debtor_account_number": "40702810101220500676",
+                                    "currency_code": "Значение не найдено в выписке",
+                                    "debtor_bank_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
+                                    "debtor_name": "ООО \"АЭС ИНВЕСТ\""
+                                }
+                            ]
+                        },
+                        "file_path": "app/uploads/3f8a1b6c0d2e4f5a7b9c1d3e5f7a9b0c/40702810101220500676  с 30.03.2022(2).xlsx",
+                        "download_url": "/normalize/download/3f8a1b6c0d2e4f5a7b9c1d3e5f7a9b0c/40702810101220500676%20%20%D1%81%2030.03.2022%282%29-output.xlsx",
+                        "errors": "null",
+                        "warnings": [
+                            {
+                                "code": 299,
+                                "message": "Значение заголовка: currency_code не найдено в выписке",
+                                "details": {}
+                            }
+                        ]
+                    }
+            }
+        }
+    },
+    422: {
+        "description": "Invalid input",
+        "content": {
+            "application/json": {
+                "status_code": 422,
+                "message": "Файл невозможно конвертировать.",
+                "status": "failure",
+                "data": "null",
+                "file_path": "null",
+                "errors": [
+                    {
+                        "code": 500,
+                        "message": "No data could be processed from the file",
+                        "details": "null"
+                    }
+                ],
+                "warnings": "null"
+            }
+        }
+    },
+    500: {
+        "description": "Internal server error",
+        "content": {"application/json": {}}
+    }
+}
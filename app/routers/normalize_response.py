@@ -1,9 +1,39 @@
 from enum import Enum
+from pathlib import PurePath
 from typing import Optional, List, Dict, Any
 
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 
+def _orjson_default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively the same way as pydantic does"""
+    # Missing values (NaT in datetime columns, pd.NA, numpy NaT scalars) are serialized as null
+    if obj is pd.NaT or obj is pd.NA or (isinstance(obj, np.generic) and pd.isna(obj)):
+        return None
+    # pandas Timestamp is a datetime subclass, which orjson does not serialize
+    if isinstance(obj, pd.Timestamp):
+        return obj.to_pydatetime()
+    # Paths (e.g. file_path in error details) are serialized as strings
+    if isinstance(obj, PurePath):
+        return str(obj)
+    raise TypeError
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z,
+        )
+
+
 class ResponseStatus(str, Enum):
     """Enumeration of possible response statuses"""
     SUCCESS = "success"
@@ -32,6 +62,7 @@ class NormalizeResponse(BaseModel):
     status: ResponseStatus = Field(..., description="Response status")
     data: Optional[Dict[str, Any]] = Field(None, description="Response data")
     file_path: Optional[str] = Field(None, description="Path to processed file")
+    download_url: Optional[str] = Field(None, description="URL to download the result .xlsx file")
     errors: Optional[List[Error]] = Field(None, description="List of errors")
     warnings: Optional[List[CustomWarning]] = Field(None, description="List of warnings")
 
@@ -44,6 +75,7 @@ class NormalizeResponse(BaseModel):
                 "status": ResponseStatus.SUCCESS,
                 "data": {"processed_rows": 100},
                 "file_path": "/path/to/file.xlsx",
+                "download_url": "/normalize/download/0f3c9a6e5b1d4c7a8e2f6b9d1a3c5e7f/file-output.xlsx",
                 "errors": None,
                 "warnings": [
                     {
@@ -57,11 +89,13 @@ class NormalizeResponse(BaseModel):
 
     @classmethod
     def success(cls, message: str, data: Optional[Dict[str, Any]] = None, 
-                file_path: Optional[str] = None) -> 'NormalizeResponse':
+                file_path: Optional[str] = None,
+                download_url: Optional[str] = None) -> 'NormalizeResponse':
         """Create a success response
         :param message:
         :param data:
         :param file_path:
+        :param download_url:
         :return:
         """
         return cls(
@@ -69,7 +103,8 @@ class NormalizeResponse(BaseModel):
             message=message,
             status=ResponseStatus.SUCCESS,
             data=data,
-            file_path=file_path
+            file_path=file_path,
+            download_url=download_url
         )
 
     @classmethod
@@ -86,7 +121,8 @@ class NormalizeResponse(BaseModel):
     @classmethod
     def success_with_warnings(cls, message: str, warnings: List[CustomWarning],
                               data: Optional[Dict[str, Any]] = None,
-                              file_path: Optional[str] = None) -> 'NormalizeResponse':
+                              file_path: Optional[str] = None,
+                              download_url: Optional[str] = None) -> 'NormalizeResponse':
         """Create a success response with warnings"""
         return cls(
             status_code=299,
@@ -94,5 +130,6 @@ class NormalizeResponse(BaseModel):
             status=ResponseStatus.SUCCESS_WITH_WARNINGS,
             data=data,
             file_path=file_path,
-            warnings=warnings
+            warnings=warnings,
+            download_url=download_url
         )
\ No newline at end of file
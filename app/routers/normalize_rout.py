@@ -1,12 +1,23 @@
+import asyncio
 import logging
 import os
+import secrets
+import shutil
+from collections import deque
+from pathlib import Path, PureWindowsPath
+from typing import BinaryIO, Deque, List, Optional
+from urllib.parse import quote
 
 from fastapi import APIRouter, File, Request, UploadFile, HTTPException, Response
+from fastapi.responses import FileResponse
+from pydantic import TypeAdapter
 
 from app.config.config import settings
 from app.config.result_messages import ResultMessages
-from app.handlers.normalize_file_handler import process_file
-from app.routers.normalize_response import NormalizeResponse, Error, CustomWarning
+from app.config.result_table_config_processor import get_result_file_path
+from app.handlers.normalize_file_handler import process_file_async, process_files_in_pool
+from app.routers.normalize_openapi_examples import PARSE_RESPONSES
+from app.routers.normalize_response import NormalizeResponse, Error, ORJSONResponse, ResponseStatus
 
 file_normalize_router = APIRouter(
     prefix="/normalize",
@@ -14,51 +25,133 @@ file_normalize_router = APIRouter(
     responses={
         200: {"description": "Successful operation"},
         400: {"description": "Invalid input"},
+        413: {"description": "File too large"},
         500: {"description": "Internal server error"}
     }
 )
 
 logger = logging.getLogger(__name__)
 
+_normalize_response_list = TypeAdapter(List[NormalizeResponse])
+
+# Upload chunk size and pool of chunk buffers reused by upload copies
+_UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB chunks
+_upload_buffers: Deque[bytearray] = deque()
+
+# Media type of the responses built directly from serialized bytes
+_JSON_MEDIA_TYPE = "application/json"
+
+# Health check response body is constant, so it is serialized once on import
+_HEALTH_BODY = NormalizeResponse.success(
+    message="Service is healthy",
+    data={"status": "UP"}
+).model_dump_json().encode()
+
+
+def _json_response(body: NormalizeResponse, status_code: int) -> Response:
+    """JSON response for a NormalizeResponse body, serialized with orjson"""
+    return ORJSONResponse(content=body.model_dump(), status_code=status_code)
+
 
 @file_normalize_router.get("/health")
 async def health_check() -> Response:
     """Health check endpoint"""
-    logger.info("Health check request received")
-    return Response(
-        status_code=200,
-        content=NormalizeResponse.success(
-            message="Service is healthy",
-            data={"status": "UP"}
-        ).model_dump_json(),
-        media_type="application/json",
+    logger.debug("Health check request received")
+    return Response(content=_HEALTH_BODY, status_code=200, media_type=_JSON_MEDIA_TYPE)
+
+def http_failure(status_code: int, detail: str, **details) -> NormalizeResponse:
+    """Failure response for a rejected request (invalid file, too large upload)"""
+    return NormalizeResponse.failure(
+        message=detail,
+        errors=[Error(code=ResultMessages.ERROR_HTTP_FAILED.status_code,
+                      message=ResultMessages.ERROR_HTTP_FAILED.message,
+                      details={"error": f"{status_code}: {detail}", **details})],
+        status_code=status_code
     )
 
-async def validate_file(file: UploadFile) -> None:
-    """Validate uploaded file"""
+
+def get_file_validation_error(file: UploadFile) -> Optional[str]:
+    """Validate uploaded file name and type (size is checked while the file is saved)
+
+    Returns:
+        Error description, or None if the file is valid
+    """
     if not file.filename:
-        raise HTTPException(status_code=400, detail="No filename provided")
+        return "No filename provided"
 
     if not settings.is_file_allowed(file.filename):
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}"
-        )
+        return f"File type not allowed. Allowed types: {settings.ALLOWED_EXTENSIONS}"
+    return None
+
+
+async def validate_file(file: UploadFile) -> Optional[Response]:
+    """Validate uploaded file, returning the failure response for an invalid file instead of raising"""
+    error = get_file_validation_error(file)
+    if error is None:
+        return None
+    logger.error("HTTP error processing file: %s", error)
+    return _json_response(http_failure(400, error), 400)
+
+
+def copy_upload_to_file(source: BinaryIO, destination: Path, max_size: int) -> int:
+    """
+    Copy uploaded file to destination by chunks through a reused buffer
+
+    Copying stops as soon as more than max_size bytes are read.
 
-    # Check file size
+    Returns:
+        Number of bytes read from the upload
+    """
+    # The file is written by chunks, so memory use does not depend on the file size;
+    # chunks are read into a pooled buffer instead of allocating bytes for every read
+    buffer = _upload_buffers.pop() if _upload_buffers else bytearray(_UPLOAD_CHUNK_SIZE)
+    view = memoryview(buffer)
     file_size = 0
-    chunk_size = 8192  # 8KB chunks
-
-    while chunk := await file.read(chunk_size):
-        file_size += len(chunk)
-        if file_size > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
-            )
+    try:
+        with open(destination, "wb") as f:
+            while read_size := source.readinto(view):
+                file_size += read_size
+                if file_size > max_size:
+                    break
+                f.write(view[:read_size])
+    finally:
+        view.release()
+        _upload_buffers.append(buffer)
+    return file_size
+
 
-    # Reset file position for future reading
-    await file.seek(0)
+async def save_upload_file(file: UploadFile) -> Path:
+    """Stream uploaded file to its own processing directory, checking file size on the way"""
+    # Only the last component of the client file name is used, so the file cannot be written outside
+    # its processing directory; Windows path rules split on both "/" and backslash
+    file_name = PureWindowsPath(file.filename).name
+    if file_name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="Invalid filename")
+
+    # Every upload gets a random directory name: it is the download key of the result file,
+    # so it must not be derivable from the file name, and uploads with the same name must not share a directory
+    file_key = secrets.token_hex(16)
+    file_process_dir = settings.PATH_TO_UPLOAD_DIRECTORY / file_key
+    # Blocking file system calls run in a worker thread, so concurrent requests are not stalled by disk I/O
+    await asyncio.to_thread(file_process_dir.mkdir, parents=True)
+    # file_process_dir already includes the upload directory; the file itself keeps its original name
+    temp_file_path = file_process_dir / file_name
+
+    # The whole copy runs in one worker thread call; a failed or rejected upload removes its whole directory,
+    # so failed requests do not leave empty directories behind
+    try:
+        file_size = await asyncio.to_thread(copy_upload_to_file, file.file, temp_file_path, settings.MAX_UPLOAD_SIZE)
+    except Exception:
+        await asyncio.to_thread(shutil.rmtree, file_process_dir, ignore_errors=True)
+        raise
+    if file_size > settings.MAX_UPLOAD_SIZE:
+        await asyncio.to_thread(shutil.rmtree, file_process_dir, ignore_errors=True)
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB"
+        )
+    logger.info("File %s saved to %s", file.filename, temp_file_path)
+    return temp_file_path
 
 
 @file_normalize_router.post(
@@ -67,297 +160,7 @@ async def validate_file(file: UploadFile) -> None:
     description="Загрузка и обработка банковской выписки",
     response_description="Нормализованные данные банковской выписки",
     response_model=None,
-    responses={
-        200: {
-            "description": "Успешная нормализация банковской выписки",
-            "content": {
-                "application/json": {
-                    "example": {
-                        "status_code": 200,
-                        "message": "File processed successfully",
-                        "status": "success",
-                        "data": {
-                            "schema": {
-                                "fields": [
-                                    {
-                                        "name": "index",
-                                        "type": "integer"
-                                    },
-                                    {
-                                        "name": "No",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "document_operation_date",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "document_type_code",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "document_number",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "document_date",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "correspondent_account_number",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "payer_or_recipient_bank",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "bank_bik",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "payer_or_recipient_name",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "payer_or_recipient_inn",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "payer_or_recipient_kpp",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "account_number",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "debit_amount",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "credit_amount",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "payment_purpose",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "debtor_account_number",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "currency_code",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "debtor_bank_name",
-                                        "type": "string"
-                                    },
-                                    {
-                                        "name": "debtor_name",
-                                        "type": "string"
-                                    }
-                                ],
-                                "primaryKey": [
-                                    "index"
-                                ],
-                                "pandas_version": "1.4.0"
-                            },
-                            "data": [
-                                {
-                                    "index": 0,
-                                    "No": "1",
-                                    "document_operation_date": "05.04.2022",
-                                    "document_type_code": "01",
-                                    "document_number": "695",
-                                    "document_date": "04.04.2022",
-                                    "correspondent_account_number": "30101810300000000881",
-                                    "payer_or_recipient_bank": "Ф-л Приволжский ПАО Банк \"ФК Открытие\"",
-                                    "bank_bik": "042282881",
-                                    "payer_or_recipient_name": "ООО \"АЭС ИНВЕСТ\"",
-                                    "payer_or_recipient_inn": "7453169760",
-                                    "payer_or_recipient_kpp": "745101001",
-                                    "account_number": "40702810602700003531",
-                                    "debit_amount": "0-00",
-                                    "credit_amount": "163955130-53",
-                                    "payment_purpose": "Перевод остатка согласно заявления клиента на закрытие счета. Без НДС.",
-                                    "debtor_account_number": "40702810101220500676",
-                                    "currency_code": "810",
-                                    "debtor_bank_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
-                                    "debtor_name": "ООО \"АЭС ИНВЕСТ\""
-                                }
-                            ]
-                        },
-                        "file_path": "/app/uploads/40702810101220500676  с 30.03.2022/40702810101220500676  с 30.03.2022-output.xlsx",
-                        "errors": "null",
-                        "warnings": "null"
-                    }
-                }
-            }
-        },
-        299: {
-            "description": "Файл обработан с предупреждениями",
-            "content": {
-                "application/json": {
-                    "example":
-                        {
-                            "status_code": 299,
-                            "message": "File processed with warnings",
-                            "status": "success_with_warnings",
-                            "data": {
-                                "schema": {
-                                    "fields": [
-                                        {
-                                            "name": "index",
-                                            "type": "integer"
-                                        },
-                                        {
-                                            "name": "document_operation_date",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "document_type_code",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "document_number",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "document_date",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "correspondent_account_number",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "payer_or_recipient_bank",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "bank_bik",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "payer_or_recipient_name",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "payer_or_recipient_inn",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "payer_or_recipient_kpp",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "account_number",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "debit_amount",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "credit_amount",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "payment_purpose",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "No",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "debtor_account_number",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "currency_code",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "debtor_bank_name",
-                                            "type": "string"
-                                        },
-                                        {
-                                            "name": "debtor_name",
-                                            "type": "string"
-                                        }
-                                    ],
-                                    "primaryKey": [
-                                        "index"
-                                    ],
-                                    "pandas_version": "1.4.0"
-                                },
-                                "data": [
-                                    {
-                                        "index": 0,
-                                        "document_operation_date": "01.04.2024",
-                                        "document_type_code": "17",
-                                        "document_number": "335248",
-                                        "document_date": "01.04.2024",
-                                        "correspondent_account_number": "30101810600000000770",
-                                        "payer_or_recipient_bank": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
-                                        "bank_bik": "048073770",
-                                        "payer_or_recipient_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
-                                        "payer_or_recipient_inn": "0274062111",
-                                        "payer_or_recipient_kpp": "027802001",
-                                        "account_number": "47426810400004070904",
-                                        "debit_amount": "0-00",
-                                        "credit_amount": "7039560-14",
-                                        "payment_purpose": "Выплата начисленных процентов за п-д с 13.03.2024 по 31.03.2024 по счету '40702810101220500676' согласно договору банковского счета №40702810101220500676 от '30/03/2022' НДС не предусмотрен.",
-                                        "No": "Заголовок не найден в выписке",
-                                        "debtor_account_number": "40702810101220500676",
-                                        "currency_code": "Значение не найдено в выписке",
-                                        "debtor_bank_name": "ФИЛИАЛ ПАО \"БАНК УРАЛСИБ\" В Г.УФА",
-                                        "debtor_name": "ООО \"АЭС ИНВЕСТ\""
-                                    }
-                                ]
-                            },
-                            "file_path": "app/uploads/40702810101220500676  с 30.03.2022(2)/40702810101220500676  с 30.03.2022(2).xlsx",
-                            "errors": "null",
-                            "warnings": [
-                                {
-                                    "code": 299,
-                                    "message": "Значение заголовка: currency_code не найдено в выписке",
-                                    "details": {}
-                                }
-                            ]
-                        }
-                }
-            }
-        },
-        422: {
-            "description": "Invalid input",
-            "content": {
-                "application/json": {
-                    "status_code": 422,
-                    "message": "Файл невозможно конвертировать.",
-                    "status": "failure",
-                    "data": "null",
-                    "file_path": "null",
-                    "errors": [
-                        {
-                            "code": 500,
-                            "message": "No data could be processed from the file",
-                            "details": "null"
-                        }
-                    ],
-                    "warnings": "null"
-                }
-            }
-        },
-        500: {
-            "description": "Internal server error",
-            "content": {"application/json": {}}
-        }
-    }
+    responses=PARSE_RESPONSES
 )
 async def parse_file(
         request: Request,
@@ -375,105 +178,220 @@ async def parse_file(
     temp_file_path = None
     try:
         client_host = request.client.host
-        logger.info(f"File parse request received from {client_host} with file {file.filename}")
+        logger.info("File parse request received from %s with file %s", client_host, file.filename)
 
-        # Validate file
-        await validate_file(file)
+        # Reject an oversized upload by its Content-Length before copying it; the size check
+        # while saving stays as a backstop for chunked requests and multipart overhead allowance
+        content_length = request.headers.get("content-length")
+        if (content_length and content_length.isdigit()
+                and int(content_length) > settings.MAX_UPLOAD_SIZE + settings.MAX_UPLOAD_MULTIPART_OVERHEAD):
+            detail = f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB"
+            logger.error("HTTP error processing file: %s", detail)
+            return _json_response(http_failure(413, detail), 413)
+
+        # Validate file; an invalid file is answered without raising and catching HTTPException
+        if (validation_response := await validate_file(file)) is not None:
+            return validation_response
 
         # Save file to temp directory
-        file_process_dir = settings.PATH_TO_UPLOAD_DIRECTORY / os.path.splitext(os.path.basename(file.filename))[0]
-        file_process_dir.mkdir(parents=True, exist_ok=True)
-        temp_file_path = settings.PATH_TO_UPLOAD_DIRECTORY / file_process_dir / file.filename
         try:
-            content = await file.read()
-            with open(temp_file_path, "wb") as f:
-                f.write(content)
-            logger.info(f"File {file.filename} saved to {temp_file_path}")
+            temp_file_path = await save_upload_file(file)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Failed to save file: {str(e)}")
-            return Response(
-                content=NormalizeResponse.failure(
+            logger.exception("Failed to save file %s", file.filename)
+            return _json_response(
+                NormalizeResponse.failure(
                     message="Failed to save file",
                     errors=[Error(code=500, message=str(e))]
-                ).model_dump_json(),
-                status_code=500,
-                media_type="application/json"
+                ),
+                500
             )
 
         # Process file
         try:
-            result = process_file(temp_file_path)
+            result = await process_file_async(temp_file_path)
             if result.errors and len(result.errors) > 0:
-                return Response(
-                    content=NormalizeResponse.failure(
+                return _json_response(
+                    NormalizeResponse.failure(
                         message=ResultMessages.ERROR_FILE_CONVERSION_FAILED.message,
-                        errors=[Error(code=err.code, message=err.message, details=err.details) for err in
-                                result.errors],
+                        # result already holds Error models built by the handler, copying them is not needed
+                        errors=result.errors,
                         status_code=ResultMessages.ERROR_FILE_CONVERSION_FAILED.status_code
-                    ).model_dump_json(),
-                    status_code=ResultMessages.ERROR_FILE_CONVERSION_FAILED.status_code
+                    ),
+                    ResultMessages.ERROR_FILE_CONVERSION_FAILED.status_code
                 )
             if result.warnings and len(result.warnings) > 0:
-                return Response(
-                    content=NormalizeResponse.success_with_warnings(
+                return _json_response(
+                    NormalizeResponse.success_with_warnings(
                         message="File processed with warnings",
                         data=result.data,
                         file_path=str(result.file_path),
-                        warnings=[
-                            CustomWarning(
-                                code=warn.code,
-                                message=warn.message,
-                                details=warn.details
-                            ) for warn in result.warnings
-                        ]
-                    ).model_dump_json(),
-                    status_code=299,
-                    media_type="application/json"
+                        warnings=result.warnings,
+                        download_url=get_download_url(temp_file_path)
+                    ),
+                    299
                 )
 
-            return Response(
-                content=NormalizeResponse.success(
+            return _json_response(
+                NormalizeResponse.success(
                     message="File processed successfully",
                     data=result.data,
-                    file_path=str(result.file_path)
-                ).model_dump_json(),
-                status_code=200,
-                media_type="application/json"
+                    file_path=str(result.file_path),
+                    download_url=get_download_url(temp_file_path)
+                ),
+                200
             )
         except Exception as e:
-            logger.error(f"Failed to process file: {str(e)}")
-            return Response(
-                content=NormalizeResponse.failure(
+            logger.exception("Failed to process file %s", file.filename)
+            return _json_response(
+                NormalizeResponse.failure(
                     message="Failed to process file",
                     errors=[Error(code=ResultMessages.ERROR_FILE_CONVERSION_FAILED.status_code,
                                   message=ResultMessages.ERROR_FILE_CONVERSION_FAILED.message,
                                   details={"error": str(e)})]
-                ).model_dump_json(),
-                status_code=500,
-                media_type="application/json"
+                ),
+                500
             )
 
     except HTTPException as e:
-        logger.error(f"HTTP error processing file: {str(e.detail)}")
-        return Response(
-            content=NormalizeResponse.failure(
-                message=str(e.detail),
-                errors=[Error(code=ResultMessages.ERROR_HTTP_FAILED.status_code,
-                              message=ResultMessages.ERROR_HTTP_FAILED.message,
-                              details={"error": str(e)})]
-            ).model_dump_json(),
-            status_code=e.status_code,
-            media_type="application/json"
+        logger.error("HTTP error processing file: %s", e.detail)
+        return _json_response(
+            http_failure(e.status_code, str(e.detail)),
+            e.status_code
         )
     except Exception as e:
-        logger.error(f"Unexpected error processing file: {str(e)}")
-        return Response(
-            content=NormalizeResponse.failure(
+        logger.exception("Unexpected error processing file %s", file.filename)
+        return _json_response(
+            NormalizeResponse.failure(
                 message="Internal server error",
                 errors=[Error(code=ResultMessages.ERROR_PARSING_FAILED.status_code,
                               message=ResultMessages.ERROR_PARSING_FAILED.message,
                               details={"error": str(e)})]
-            ).model_dump_json(),
-            status_code=500,
-            media_type="application/json"
+            ),
+            500
+        )
+
+
+@file_normalize_router.post(
+    "/parse/batch",
+    summary="Пакетная нормализация банковских выписок",
+    description="Загрузка и параллельная обработка нескольких банковских выписок",
+    response_description="Результаты нормализации в порядке загрузки файлов",
+    response_model=None,
+)
+async def parse_files_batch(
+        request: Request,
+        files: List[UploadFile] = File(..., description="Файлы банковских выписок")) -> Response:
+    """
+    Parse and normalize several uploaded files in parallel worker processes
+
+    Args:
+        request: FastAPI request object
+        files: Uploaded files
+
+    Returns:
+        Response object with a list of processing results, one per file
+    """
+    client_host = request.client.host
+    logger.info("Batch parse request received from %s with %d files", client_host, len(files))
+
+    results: List[NormalizeResponse] = [None] * len(files)
+    saved_files = []
+    for idx, file in enumerate(files):
+        if (error := get_file_validation_error(file)) is not None:
+            logger.error("HTTP error processing file %s: %s", file.filename, error)
+            results[idx] = http_failure(400, error, file_name=file.filename)
+            continue
+        try:
+            saved_files.append((idx, await save_upload_file(file)))
+        except HTTPException as e:
+            logger.error("HTTP error processing file %s: %s", file.filename, e.detail)
+            results[idx] = http_failure(e.status_code, str(e.detail), file_name=file.filename)
+        except Exception as e:
+            logger.exception("Failed to save file %s", file.filename)
+            results[idx] = NormalizeResponse.failure(
+                message="Failed to save file",
+                errors=[Error(code=500, message=str(e), details={"file_name": file.filename})],
+                status_code=500
+            )
+
+    try:
+        processed = await process_files_in_pool([path for _, path in saved_files])
+    except Exception as e:
+        logger.exception("Failed to process files")
+        return _json_response(
+            NormalizeResponse.failure(
+                message="Failed to process files",
+                errors=[Error(code=ResultMessages.ERROR_FILE_CONVERSION_FAILED.status_code,
+                              message=ResultMessages.ERROR_FILE_CONVERSION_FAILED.message,
+                              details={"error": str(e)})]
+            ),
+            500
         )
+    for (idx, path), result in zip(saved_files, processed):
+        if result.status != ResponseStatus.FAILURE:
+            result.download_url = get_download_url(path)
+        results[idx] = result
+
+    return ORJSONResponse(
+        content=_normalize_response_list.dump_python(results),
+        status_code=200
+    )
+
+
+def get_download_url(file_path: Path) -> str:
+    """Download URL of the result file of an upload saved by save_upload_file"""
+    # The file name may contain spaces or Cyrillic, so it is percent-encoded
+    return f"{file_normalize_router.prefix}/download/{file_path.parent.name}/{quote(get_result_file_path(file_path).name)}"
+
+
+def find_result_file(file_key: str, file_name: str) -> Optional[Path]:
+    """Output .xlsx file in the processing directory of an uploaded file, None if there is none"""
+    # Both parts must be single names inside the upload directory, and only result files are served
+    for name in (file_key, file_name):
+        if name in (".", "..") or os.path.basename(name) != name:
+            return None
+    if not file_name.endswith("-output.xlsx"):
+        return None
+    result_file_path = settings.PATH_TO_UPLOAD_DIRECTORY / file_key / file_name
+    return result_file_path if result_file_path.is_file() else None
+
+
+@file_normalize_router.get(
+    "/download/{file_key}/{file_name}",
+    summary="Скачивание нормализованной выписки",
+    description="Скачивание итогового .xlsx файла по ссылке download_url из ответа /parse",
+    response_description="Итоговый .xlsx файл",
+    response_model=None,
+)
+async def download_result_file(file_key: str, file_name: str) -> Response:
+    """
+    Download the output .xlsx file produced for an uploaded statement
+
+    Args:
+        file_key: Download key of the uploaded file (random name of its processing directory)
+        file_name: Name of the output .xlsx file
+
+    Returns:
+        FileResponse streaming the file (sent with sendfile where available)
+    """
+    result_file_path = await asyncio.to_thread(find_result_file, file_key, file_name)
+    if result_file_path is None:
+        logger.error("Result file %s for %s not found", file_name, file_key)
+        return _json_response(
+            NormalizeResponse.failure(
+                message=ResultMessages.ERROR_RESULT_FILE_NOT_FOUND.message,
+                errors=[Error(code=ResultMessages.ERROR_RESULT_FILE_NOT_FOUND.status_code,
+                              message=ResultMessages.ERROR_RESULT_FILE_NOT_FOUND.message,
+                              details={"file_key": file_key, "file_name": file_name})],
+                status_code=ResultMessages.ERROR_RESULT_FILE_NOT_FOUND.status_code
+            ),
+            ResultMessages.ERROR_RESULT_FILE_NOT_FOUND.status_code
+        )
+
+    return FileResponse(
+        result_file_path,
+        filename=result_file_path.name,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )